@@ -0,0 +1,306 @@
+"""
+Static ROM analyzer
+
+Walks the code reachable from 0x200 without running it, following
+jumps, calls and skips, and reports the control-flow graph, bytes never
+reached as code, opcodes the interpreter cannot run and an opcode
+histogram. Opcodes are classified with the interpreter's own decode, so
+the analysis never disagrees with what Chip8.emulate_cycle would do.
+
+    python analyzer.py roms/ > analysis.jsonl
+    python analyzer.py game.ch8 --disassemble
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from chip8 import Chip8
+from memory import PROGRAM_START
+from profiler import handler_name
+from util import compile_pattern, get_opcode_digits
+
+MNEMONICS = {
+    '00E0': 'CLS',
+    '00EE': 'RET',
+    '1NNN': 'JP {nnn:#05x}',
+    '2NNN': 'CALL {nnn:#05x}',
+    '3XNN': 'SE V{x:X}, {nn:#04x}',
+    '4XNN': 'SNE V{x:X}, {nn:#04x}',
+    '5XY0': 'SE V{x:X}, V{y:X}',
+    '6XNN': 'LD V{x:X}, {nn:#04x}',
+    '7XNN': 'ADD V{x:X}, {nn:#04x}',
+    '8XY0': 'LD V{x:X}, V{y:X}',
+    '8XY1': 'OR V{x:X}, V{y:X}',
+    '8XY2': 'AND V{x:X}, V{y:X}',
+    '8XY3': 'XOR V{x:X}, V{y:X}',
+    '8XY4': 'ADD V{x:X}, V{y:X}',
+    '8XY5': 'SUB V{x:X}, V{y:X}',
+    '8XY6': 'SHR V{x:X}',
+    '8XY7': 'SUBN V{x:X}, V{y:X}',
+    '8XYE': 'SHL V{x:X}',
+    '9XY0': 'SNE V{x:X}, V{y:X}',
+    'ANNN': 'LD I, {nnn:#05x}',
+    'BNNN': 'JP V0, {nnn:#05x}',
+    'CXNN': 'RND V{x:X}, {nn:#04x}',
+    'DXYN': 'DRW V{x:X}, V{y:X}, {n}',
+    'EX9E': 'SKP V{x:X}',
+    'EXA1': 'SKNP V{x:X}',
+    'FX07': 'LD V{x:X}, DT',
+    'FX0A': 'LD V{x:X}, K',
+    'FX15': 'LD DT, V{x:X}',
+    'FX18': 'LD ST, V{x:X}',
+    'FX1E': 'ADD I, V{x:X}',
+    'FX29': 'LD F, V{x:X}',
+    'FX33': 'LD B, V{x:X}',
+    'FX55': 'LD [I], V{x:X}',
+    'FX65': 'LD V{x:X}, [I]',
+}
+
+SKIP_PATTERNS = {'3XNN', '4XNN', '5XY0', '9XY0', 'EX9E', 'EXA1'}
+
+COMPILED_MNEMONICS = [(compile_pattern(pattern), pattern)
+                      for pattern in MNEMONICS]
+
+
+def handler_pattern(handler):
+    """
+    Returns the opcode pattern a handler implements, from the suffix of
+    its method name, as in clear_screen_00e0 or addition_8xx4
+    """
+    pattern = handler_name(handler).rsplit('_', 1)[-1]
+    return compile_pattern(pattern)
+
+
+class OpcodeClassifier:
+    """
+    Decodes opcodes with a scratch Chip8 and caches the result
+    """
+    def __init__(self):
+        self.chip8 = Chip8(seed=0)
+        self.patterns = {}
+
+    def pattern(self, opcode):
+        """
+        Returns the pattern, such as '8XY4', of the instruction the
+        interpreter runs for opcode, or None if it cannot run it
+        """
+        if opcode in self.patterns:
+            return self.patterns[opcode]
+
+        pattern = None
+        try:
+            (mask, value) = handler_pattern(self.chip8.decode(opcode))
+        except (IndexError, KeyError, ValueError):
+            mask = None
+        if mask is not None and opcode & mask == value:
+            pattern = next(p for ((m, v), p) in COMPILED_MNEMONICS
+                           if opcode & m == v)
+        self.patterns[opcode] = pattern
+        return pattern
+
+
+CLASSIFIER = OpcodeClassifier()
+
+
+@dataclass
+class Instruction:
+    address: int
+    opcode: int
+    pattern: str
+
+    @property
+    def supported(self):
+        return self.pattern is not None
+
+    def successors(self):
+        """
+        Returns the addresses execution can continue at within the
+        current routine; calls resume at the following instruction
+        """
+        pattern = self.pattern
+        following = self.address + 2
+        if pattern is None or pattern in ('00EE', 'BNNN'):
+            return []
+        if pattern == '1NNN':
+            return [self.opcode & 0x0FFF]
+        if pattern in SKIP_PATTERNS:
+            return [following, following + 2]
+        return [following]
+
+    def disassemble(self):
+        if self.pattern is None:
+            return f'DW {self.opcode:#06x}'
+        (_, x, y, n) = get_opcode_digits(self.opcode)
+        return MNEMONICS[self.pattern].format(
+            x=x, y=y, n=n, nn=self.opcode & 0xFF, nnn=self.opcode & 0x0FFF)
+
+
+@dataclass
+class BasicBlock:
+    start: int
+    end: int
+    successors: list = field(default_factory=list)
+    calls: list = field(default_factory=list)
+
+
+@dataclass
+class Analysis:
+    size: int
+    instructions: dict
+    blocks: dict
+    data_regions: list
+    unsupported: list
+    indirect_jumps: list
+    histogram: Counter
+
+    def disassemble(self):
+        lines = []
+        for (address, instruction) in sorted(self.instructions.items()):
+            if address in self.blocks:
+                lines.append(f'L{address:03X}:')
+            lines.append(f'    {address:03X}  {instruction.opcode:04X}  '
+                         f'{instruction.disassemble()}')
+        return '\n'.join(lines)
+
+    def summary(self):
+        return {
+            'size': self.size,
+            'instructions': len(self.instructions),
+            'blocks': len(self.blocks),
+            'data_bytes': sum(end - start
+                              for (start, end) in self.data_regions),
+            'unsupported': [f'{address:03X}:{opcode:04X}'
+                            for (address, opcode) in self.unsupported],
+            'indirect_jumps': [f'{address:03X}'
+                               for address in self.indirect_jumps],
+            'histogram': dict(self.histogram.most_common()),
+        }
+
+
+def analyze(program, start=PROGRAM_START, classifier=CLASSIFIER):
+    """
+    Analyzes program, the bytes of a ROM loaded at start
+    """
+    end = start + len(program)
+    instructions = {}
+    leaders = {start}
+    calls = {}
+    pending = [start]
+    while pending:
+        address = pending.pop()
+        if address in instructions or not start <= address < end - 1:
+            continue
+        offset = address - start
+        opcode = (program[offset] << 8) | program[offset + 1]
+        instruction = Instruction(address, opcode, classifier.pattern(opcode))
+        instructions[address] = instruction
+
+        successors = instruction.successors()
+        if instruction.pattern == '2NNN':
+            target = opcode & 0x0FFF
+            calls[address] = target
+            leaders.add(target)
+            pending.append(target)
+        if successors != [address + 2]:
+            leaders.update(successors)
+            leaders.add(address + 2)
+        pending.extend(successors)
+
+    blocks = build_blocks(instructions, leaders, calls)
+    return Analysis(
+        size=len(program),
+        instructions=instructions,
+        blocks=blocks,
+        data_regions=find_data_regions(instructions, start, end),
+        unsupported=[(i.address, i.opcode)
+                     for i in sorted(instructions.values(),
+                                     key=lambda i: i.address)
+                     if not i.supported],
+        indirect_jumps=sorted(i.address for i in instructions.values()
+                              if i.pattern == 'BNNN'),
+        histogram=Counter(i.pattern or 'unsupported'
+                          for i in instructions.values()))
+
+
+def build_blocks(instructions, leaders, calls):
+    blocks = {}
+    for start in sorted(leaders & instructions.keys()):
+        address = start
+        block = BasicBlock(start, start)
+        while True:
+            instruction = instructions[address]
+            if address in calls:
+                block.calls.append(calls[address])
+            successors = instruction.successors()
+            following = address + 2
+            if (successors != [following] or following in leaders
+                    or following not in instructions):
+                block.end = following
+                block.successors = successors
+                break
+            address = following
+        blocks[start] = block
+    return blocks
+
+
+def find_data_regions(instructions, start, end):
+    """
+    Returns (start, end) ranges of bytes no reachable instruction covers
+    """
+    covered = bytearray(end - start)
+    for address in instructions:
+        covered[address - start:address - start + 2] = b'\x01\x01'
+
+    regions = []
+    region_start = None
+    for (offset, is_code) in enumerate(covered):
+        if not is_code and region_start is None:
+            region_start = start + offset
+        elif is_code and region_start is not None:
+            regions.append((region_start, start + offset))
+            region_start = None
+    if region_start is not None:
+        regions.append((region_start, end))
+    return regions
+
+
+def analyze_file(path):
+    with open(path, 'rb') as rom_file:
+        return analyze(rom_file.read())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Analyze Chip-8 ROMs')
+    parser.add_argument('paths', nargs='+',
+                        help='ROM files or directories of ROMs')
+    parser.add_argument('--disassemble', action='store_true',
+                        help='print a listing instead of a JSON summary')
+    args = parser.parse_args(argv)
+
+    roms = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            roms.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if os.path.isfile(os.path.join(path, name))))
+        else:
+            roms.append(path)
+
+    for rom in roms:
+        started = time.perf_counter()
+        analysis = analyze_file(rom)
+        if args.disassemble:
+            print(f'; {rom}')
+            print(analysis.disassemble())
+            continue
+        summary = {'rom': rom, **analysis.summary(),
+                   'wall_time': time.perf_counter() - started}
+        print(json.dumps(summary))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
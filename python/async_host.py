@@ -0,0 +1,128 @@
+"""
+asyncio front end
+
+AsyncMachine runs a Chip8 in 60hz frames as an asyncio task. Key
+events arrive through an asyncio.Queue and frames go out as an async
+iterator, so one event loop can host many machines without a thread
+per machine.
+
+serve() exposes a machine over TCP. Each client receives every changed
+frame as the 256-byte packed framebuffer, or delta encoded with
+frame_delta when delta is set, and sends single-byte key events: 0x1K
+presses key K and 0x2K releases it.
+"""
+import asyncio
+from frame_delta import FrameEncoder
+from graphics import ROWS_STRUCT
+from replay import KEY_PRESS, KEY_RELEASE
+from scheduler import Scheduler, TIMER_HZ
+
+
+class AsyncMachine:
+    def __init__(self, chip8, cpu_hz=700, throttled=True, frame_buffer=2,
+                 skip_idle=True):
+        self.chip8 = chip8
+        self.throttled = throttled
+        self.scheduler = Scheduler(chip8, cpu_hz, render=self.publish_frame,
+                                   throttled=False, skip_idle=skip_idle)
+        self.key_events = asyncio.Queue()
+        self.frame_buffer = frame_buffer
+        self.subscribers = set()
+
+    def press_key(self, key_num):
+        self.key_events.put_nowait((key_num, True))
+
+    def release_key(self, key_num):
+        self.key_events.put_nowait((key_num, False))
+
+    async def run(self, frames=None):
+        """
+        Runs frames frames, or until cancelled, then ends every frame
+        stream
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        try:
+            while frames is None or self.scheduler.frames < frames:
+                self.apply_key_events()
+                self.scheduler.run_frame()
+                if self.throttled:
+                    deadline += 1 / TIMER_HZ
+                    await asyncio.sleep(max(0, deadline - loop.time()))
+                else:
+                    await asyncio.sleep(0)
+        finally:
+            for subscriber in self.subscribers:
+                self.__offer(subscriber, None)
+
+    def apply_key_events(self):
+        keys = self.chip8.keys
+        while not self.key_events.empty():
+            (key_num, pressed) = self.key_events.get_nowait()
+            if pressed:
+                keys.press_key(key_num)
+            else:
+                keys.release_key(key_num)
+
+    def publish_frame(self, graphics):
+        frame = graphics.to_bytes()
+        for subscriber in self.subscribers:
+            self.__offer(subscriber, frame)
+
+    async def frames(self):
+        """
+        Yields each changed frame as packed framebuffer bytes
+
+        A subscriber that falls behind skips to the newest frames
+        rather than holding the machine back.
+        """
+        subscriber = asyncio.Queue(self.frame_buffer)
+        self.subscribers.add(subscriber)
+        try:
+            while True:
+                frame = await subscriber.get()
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            self.subscribers.discard(subscriber)
+
+    def __offer(self, subscriber, frame):
+        if subscriber.full():
+            subscriber.get_nowait()
+        subscriber.put_nowait(frame)
+
+
+async def handle_client(machine, reader, writer, delta=False):
+    encoder = FrameEncoder() if delta else None
+
+    async def send_frames():
+        async for frame in machine.frames():
+            if encoder is not None:
+                frame = encoder.encode(ROWS_STRUCT.unpack(frame))
+            writer.write(frame)
+            await writer.drain()
+
+    sender = asyncio.ensure_future(send_frames())
+    try:
+        while True:
+            events = await reader.read(64)
+            if not events:
+                break
+            for event in events:
+                if event & 0xF0 == KEY_PRESS:
+                    machine.press_key(event & 0x0F)
+                elif event & 0xF0 == KEY_RELEASE:
+                    machine.release_key(event & 0x0F)
+    finally:
+        sender.cancel()
+        writer.close()
+
+
+async def serve(machine, host='127.0.0.1', port=0, delta=False):
+    """
+    Starts a TCP server streaming machine's frames and returns it
+    """
+    return await asyncio.start_server(
+        lambda reader, writer: handle_client(machine, reader, writer, delta),
+        host, port)
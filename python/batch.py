@@ -0,0 +1,114 @@
+"""
+Headless batch runner
+
+Runs every ROM in a directory for a fixed number of cycles, one Chip8
+per ROM spread across a process pool, and prints a JSON summary line
+per ROM. Nothing here imports sdl2.
+
+    python batch.py roms/ --cycles 100000 --jobs 8
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from chip8 import Chip8
+from scheduler import TIMER_HZ
+
+CPU_HZ = 700
+
+
+@dataclass
+class RomSummary:
+    rom: str
+    cycles: int
+    pc: int
+    framebuffer_hash: str
+    wall_time: float
+    error: str = None
+
+
+def run_rom(path, cycles, cpu_hz=CPU_HZ):
+    chip8 = Chip8()
+
+    # Summaries go to stdout, so the sound timer must stay silent
+    chip8.timers.beep = None
+
+    # Timers tick at 60hz as if run at cpu_hz, with frames of whole
+    # cycles and the fractional remainder carried as Scheduler does
+    cycles_per_frame = cpu_hz / TIMER_HZ
+    cycle_budget = cycles_per_frame
+    next_tick = int(cycle_budget)
+    cycle_budget -= next_tick
+    executed = 0
+    error = None
+    start = time.perf_counter()
+    try:
+        with open(path, 'rb') as program_file:
+            chip8.load_game(program_file)
+        emulate_cycle = chip8.emulate_cycle
+        tick = chip8.timers.tick
+        while executed < cycles:
+            emulate_cycle()
+            executed += 1
+            while executed >= next_tick:
+                tick()
+                cycle_budget += cycles_per_frame
+                frame = int(cycle_budget)
+                cycle_budget -= frame
+                next_tick += frame
+    except Exception as exc:  # pylint: disable=broad-except
+        error = f'{type(exc).__name__}: {exc}'
+    wall_time = time.perf_counter() - start
+
+    framebuffer_hash = hashlib.sha1(chip8.graphics.to_bytes()).hexdigest()
+    return RomSummary(os.path.basename(path), executed,
+                      chip8.program_counter.value, framebuffer_hash,
+                      wall_time, error)
+
+
+def find_roms(rom_dir):
+    return sorted(
+        os.path.join(rom_dir, name) for name in os.listdir(rom_dir)
+        if os.path.isfile(os.path.join(rom_dir, name)))
+
+
+def run_batch(rom_dir, cycles, jobs=None):
+    roms = find_roms(rom_dir)
+    if jobs == 1:
+        return [run_rom(rom, cycles) for rom in roms]
+
+    jobs = jobs or os.cpu_count()
+    chunksize = max(1, len(roms) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(
+            executor.map(run_rom, roms, [cycles] * len(roms),
+                         chunksize=chunksize))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run Chip-8 ROMs headless')
+    parser.add_argument('rom_dir')
+    parser.add_argument('--cycles', type=int, default=100000)
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='worker processes (default: one per core)')
+    parser.add_argument('--output', default=None,
+                        help='file for JSON lines summary (default: stdout)')
+    args = parser.parse_args(argv)
+
+    summaries = run_batch(args.rom_dir, args.cycles, args.jobs)
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for summary in summaries:
+            output.write(json.dumps(asdict(summary)) + '\n')
+    finally:
+        if args.output:
+            output.close()
+    return 1 if any(s.error for s in summaries) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Benchmarks for the emulator hot paths
+
+Not collected by a plain pytest run; run this file explicitly:
+
+    pytest bench_chip8.py --benchmark-save=baseline
+    pytest bench_chip8.py --benchmark-compare \\
+        --benchmark-compare-fail=mean:10%
+
+The second command fails when any benchmark's mean time, and so its
+instructions per second, regresses by more than 10% against the last
+saved run. Set CHIP8_BENCH_CYCLES to change the length of the full-ROM
+workloads (default one million cycles). The timed ROM runs also report
+emulated COSMAC VIP machine cycles per second.
+"""
+# pylint: disable=redefined-outer-name
+
+import os
+from io import BytesIO
+import pytest
+from chip8 import Chip8
+from recompiler import Recompiler
+from scheduler import Scheduler
+from timing import TimingModel
+
+pytest.importorskip('pytest_benchmark')
+
+ROM_CYCLES = int(os.environ.get('CHIP8_BENCH_CYCLES', 1000000))
+
+# Under VIP timing each DXYN ends the frame, so the arithmetic ROM runs
+# about 9 instructions a frame and the control-flow ROM about 207; this
+# is roughly ROM_CYCLES instructions of the control-flow ROM
+TIMED_FRAMES = ROM_CYCLES // 200
+
+# Rounds for opcodes that need the call stack emptied before each one
+CALL_ROUNDS = 10000
+
+# One representative opcode per OpcodeSet
+OPCODES = {
+    '0xxx_clear_screen': 0x00E0,
+    '1xxx_jump': 0x1200,
+    '2xxx_call': 0x2300,
+    '3xxx_skip_equal': 0x3105,
+    '4xxx_skip_not_equal': 0x4105,
+    '5xxx_skip_registers_equal': 0x5120,
+    '6xxx_set_register': 0x6142,
+    '7xxx_add_to_register': 0x7103,
+    '8xxx_addition': 0x8124,
+    '9xxx_skip_registers_not_equal': 0x9120,
+    'Axxx_set_address': 0xA300,
+    'Bxxx_jump_with_offset': 0xB200,
+    'Cxxx_random': 0xC1FF,
+    'Dxxx_draw_sprite': 0xD125,
+    'Exxx_skip_if_pressed': 0xE19E,
+    'Fxxx_get_key': 0xF10A,
+}
+
+# Arithmetic in a loop, with a draw every iteration
+ARITHMETIC_ROM = bytes([
+    0x60, 0x00, 0x61, 0x01, 0xA0, 0x00,  # V0 = 0, V1 = 1, I = 0
+    0x70, 0x01, 0x82, 0x14, 0x83, 0x26, 0x84, 0x33,
+    0x85, 0x4E, 0x30, 0x00, 0x71, 0x01, 0xD0, 0x15,
+    0x12, 0x06,
+])
+
+# A subroutine call, skips and key checks in a loop
+CONTROL_FLOW_ROM = bytes([
+    0x22, 0x0E,  # 0x200: call 0x20E
+    0x40, 0x10,  # 0x202: skip if V0 != 0x10
+    0x60, 0x00,  # 0x204: V0 = 0
+    0xE1, 0xA1,  # 0x206: skip if key V1 not pressed
+    0x61, 0x00,  # 0x208: V1 = 0
+    0x12, 0x00,  # 0x20A: jump 0x200
+    0x00, 0x00,
+    0x70, 0x01,  # 0x20E: V0 += 1
+    0x00, 0xEE,  # 0x210: return
+])
+
+
+def make_chip(program=b''):
+    chip = Chip8()
+    chip.load_game(BytesIO(program))
+    chip.keys.press_key(1)
+    return chip
+
+
+def run_rom(chip, cycles):
+    emulate_cycle = chip.emulate_cycle
+    for _ in range(cycles):
+        emulate_cycle()
+
+
+def bench_opcode(benchmark, chip, opcode, function, *args):
+    """
+    Benchmarks function(*args), emptying the call stack before each
+    round when opcode is a 2NNN call so repeated calls never overflow it
+    """
+    if opcode >> 12 != 0x2:
+        benchmark(function, *args)
+        return
+
+    def empty_stack():
+        chip.stack.load([])
+        return (args, {})
+
+    benchmark.pedantic(function, setup=empty_stack, rounds=CALL_ROUNDS)
+
+
+def record_rate(benchmark, key, count):
+    """
+    Stores count per second of mean round time in extra_info, unless
+    timing is turned off with --benchmark-disable
+    """
+    if benchmark.stats is not None:
+        benchmark.extra_info[key] = count / benchmark.stats.stats.mean
+
+
+@pytest.mark.parametrize('name', sorted(OPCODES))
+def test_opcode_set_execute(benchmark, name):
+    chip = make_chip()
+    opcode = OPCODES[name]
+    opcode_set = chip.op_table[opcode >> 12]
+    benchmark.group = 'execute'
+    bench_opcode(benchmark, chip, opcode, opcode_set.execute, opcode)
+
+
+@pytest.mark.parametrize('name', sorted(OPCODES))
+def test_decoded_handler(benchmark, name):
+    chip = make_chip()
+    opcode = OPCODES[name]
+    benchmark.group = 'decoded'
+    bench_opcode(benchmark, chip, opcode, chip.decode(opcode))
+
+
+def test_call_and_return(benchmark):
+    chip = make_chip()
+    call = chip.decode(0x2300)
+    ret = chip.decode(0x00EE)
+    program_counter = chip.program_counter
+
+    def call_and_return():
+        call()
+        ret()
+        # 00EE resumes after the call; go back so the PC stays in range
+        program_counter.value = 0x200
+
+    benchmark(call_and_return)
+
+
+def test_set_sprite_line(benchmark):
+    chip = make_chip()
+    benchmark(chip.graphics.set_sprite_line, 13, 7, 0xA5)
+
+
+def test_memory_get(benchmark):
+    chip = make_chip()
+    benchmark(chip.memory.get, 0x200, 2)
+
+
+def test_emulate_cycle(benchmark):
+    chip = make_chip(b'\x12\x00')
+    benchmark(chip.emulate_cycle)
+
+
+@pytest.mark.parametrize('program', [ARITHMETIC_ROM, CONTROL_FLOW_ROM],
+                         ids=['arithmetic', 'control_flow'])
+def test_rom_interpreted(benchmark, program):
+    chip = make_chip(program)
+    benchmark.group = 'rom'
+    benchmark.pedantic(run_rom, (chip, ROM_CYCLES), rounds=3)
+    record_rate(benchmark, 'instructions_per_second', ROM_CYCLES)
+
+
+@pytest.mark.parametrize('program', [ARITHMETIC_ROM, CONTROL_FLOW_ROM],
+                         ids=['arithmetic', 'control_flow'])
+def test_rom_recompiled(benchmark, program):
+    recompiler = Recompiler(make_chip(program))
+    benchmark.group = 'rom'
+    benchmark.pedantic(recompiler.run, (ROM_CYCLES, ), rounds=3)
+    record_rate(benchmark, 'instructions_per_second', ROM_CYCLES)
+
+
+@pytest.mark.parametrize('program', [ARITHMETIC_ROM, CONTROL_FLOW_ROM],
+                         ids=['arithmetic', 'control_flow'])
+def test_rom_cosmac_vip_timing(benchmark, program):
+    timing = TimingModel.cosmac_vip()
+    scheduler = Scheduler(make_chip(program), throttled=False, timing=timing)
+    benchmark.group = 'timed'
+    benchmark.pedantic(scheduler.run, (TIMED_FRAMES, ), rounds=3)
+    record_rate(benchmark, 'instructions_per_second', scheduler.cycles / 3)
+    record_rate(benchmark, 'emulated_cycles_per_second', timing.cycles / 3)
@@ -1,25 +1,63 @@
+import random
+import struct
 from dataclasses import dataclass
 from memory import Memory
-from graphics import Graphics
-from util import get_opcode_digits
+from graphics import Graphics, ROWS_STRUCT
+from stack import STACK_DEPTH, Stack
 import opcodes
 
+SNAPSHOT_MAGIC = b'CHP8'
+SNAPSHOT_VERSION = 2
+
+# Magic, version, V0-VF, I, PC, delay timer, sound timer, keypad bits,
+# stack depth. The stack, memory, framebuffer and random number
+# generator state follow the header.
+SNAPSHOT_HEADER = struct.Struct('>4sB16sHHBBHB')
+RANDOM_STATE = struct.Struct('>625I')
+RANDOM_STATE_VERSION = 3
+
 
-@dataclass
 class Registers:
-    v: bytearray = bytearray(16)
-    i: int = 0
+    __slots__ = ('v', 'i')
+
+    def __init__(self):
+        # V0-VF, allocated per machine and only ever modified in place
+        self.v = bytearray(16)
+        self.i = 0
+
+
+@dataclass
+class Quirks:
+    """
+    Behaviours that differ between Chip-8 interpreters
+    """
+    # FX55/FX65 leave I pointing past the last register, as on the
+    # COSMAC VIP, rather than unchanged as in CHIP-48 and SUPER-CHIP
+    load_store_increments_i: bool = True
+
+    # DXYN clips sprites at the screen edges, as on the COSMAC VIP,
+    # rather than wrapping them round to the opposite edge
+    clip_sprites: bool = True
 
 
 class Keypad:
+    __slots__ = ('__key_state', 'listeners')
+
     def __init__(self):
         self.__key_state = [False] * 16
 
+        # Callables taking (key_num, pressed), notified on every change
+        self.listeners = []
+
     def press_key(self, key_num):
         self.__key_state[key_num] = True
+        for listener in self.listeners:
+            listener(key_num, True)
 
     def release_key(self, key_num):
         self.__key_state[key_num] = False
+        for listener in self.listeners:
+            listener(key_num, False)
 
     def is_pressed(self, key_num):
         return self.__key_state[key_num]
@@ -27,23 +65,51 @@ class Keypad:
     def pressed_keys(self):
         return [i for i, pressed in enumerate(self.__key_state) if pressed]
 
+    def get_state(self):
+        """
+        Returns the keypad state as a bitmask, bit N set if key N is down
+        """
+        return sum(1 << i for i, pressed in enumerate(self.__key_state)
+                   if pressed)
+
+    def set_state(self, key_bits):
+        for i in range(16):
+            self.__key_state[i] = key_bits & (1 << i) != 0
+
+
+def print_beep():
+    print('BEEP\n')
+
 
 class Timers:
+    __slots__ = ('delay_timer', 'sound_timer', 'listeners', 'beep')
+
     def __init__(self):
         self.delay_timer = 0
         self.sound_timer = 0
 
+        # Callables taking no arguments, notified on every tick
+        self.listeners = []
+
+        # Called when the sound timer runs out, or None for silence
+        self.beep = print_beep
+
     def tick(self):
+        for listener in self.listeners:
+            listener()
+
         if self.delay_timer > 0:
             self.delay_timer -= 1
 
         if self.sound_timer > 0:
-            if self.sound_timer == 1:
-                print('BEEP\n')
+            if self.sound_timer == 1 and self.beep is not None:
+                self.beep()
             self.sound_timer -= 1
 
 
 class ProgramCounter:
+    __slots__ = ('value', )
+
     def __init__(self):
         self.value = 0x200
 
@@ -58,22 +124,20 @@ class ProgramCounter:
 
 
 class Chip8:
-    def __init__(self):
+    def __init__(self, memory=None, seed=None, quirks=None,
+                 stack_depth=STACK_DEPTH):
         self.program_counter = ProgramCounter()
 
-        self.stack = []
+        self.stack = Stack(stack_depth)
 
         # Chip 8 has 15 8-bit registers: V0-VE
         # 16th register is carry flag
         self.registers = Registers()
 
-        # Index register
-        self.i = 0
-
         # Graphics memory
         self.graphics = Graphics()
 
-        # Timer registers should count at 60hz
+        # Timer registers count down at 60hz, driven by the Scheduler
         self.timers = Timers()
 
         # State of hex-based keypad
@@ -83,12 +147,20 @@ class Chip8:
         # 0x000-0x1FF - Chip 8 interpreter (contains font set in emu)
         # 0x050-0x0A0 - Used for the built in 4x5 pixel font set (0-F)
         # 0x200-0xFFF - Program ROM and work RAM
-        self.memory = Memory()
+        self.memory = memory if memory is not None else Memory()
+
+        # Source of CXNN random numbers, seedable for reproducible runs
+        self.random = random.Random(seed)
+
+        self.quirks = quirks if quirks is not None else Quirks()
 
-        self.op_table = [None] * 16
         self.register_opcodes()
 
+        # Handlers for every opcode seen so far, with operands bound
+        self.decoded_opcodes = {}
+
     def register_opcodes(self):
+        self.op_table = [None] * 16
         self.op_table[0] = opcodes.OpcodeSet0xxx(self)
         self.op_table[1] = opcodes.OpcodeSet1xxx(self)
         self.op_table[2] = opcodes.OpcodeSet2xxx(self)
@@ -106,15 +178,120 @@ class Chip8:
         self.op_table[0xE] = opcodes.OpcodeSetExxx(self)
         self.op_table[0xF] = opcodes.OpcodeSetFxxx(self)
 
+    def decode(self, opcode):
+        handler = self.decoded_opcodes.get(opcode)
+        if handler is None:
+            if self.op_table is None:
+                self.register_opcodes()
+            handler = self.op_table[opcode >> 12].decode(opcode)
+            self.decoded_opcodes[opcode] = handler
+        return handler
+
     def emulate_cycle(self):
-        opcode = int.from_bytes(self.memory.get(self.program_counter.value, 2),
-                                byteorder='big')
+        data = self.memory.data
+        pc = self.program_counter.value
+        opcode = (data[pc] << 8) | data[pc + 1]
 
-        (first_digit, _, _, _) = get_opcode_digits(opcode)
-        opcode_set = self.op_table[first_digit]
-        opcode_set.execute(opcode)
-        self.timers.tick()
+        handler = self.decoded_opcodes.get(opcode)
+        if handler is None:
+            handler = self.decode(opcode)
+        handler()
 
     def load_game(self, program_file):
         game_data = program_file.read()
         self.memory.load(game_data)
+
+    def fork(self):
+        """
+        Returns an independent copy of this machine
+
+        Memory is shared copy-on-write between parent and child, so a
+        fork costs the same regardless of how much memory is in use.
+        The child skips __init__ and copies only the machine state. Its
+        opcode sets, which are bound to its own registers, are built
+        when it first decodes, so a branch that never runs stays small.
+        """
+        child = Chip8.__new__(type(self))
+        child.program_counter = ProgramCounter()
+        child.program_counter.value = self.program_counter.value
+        child.stack = Stack(self.stack.depth())
+        child.stack.load(list(self.stack))
+        child.registers = Registers()
+        child.registers.v[:] = self.registers.v
+        child.registers.i = self.registers.i
+        child.graphics = Graphics()
+        child.graphics.load_rows(self.graphics.rows)
+        child.timers = Timers()
+        child.timers.delay_timer = self.timers.delay_timer
+        child.timers.sound_timer = self.timers.sound_timer
+        child.keys = Keypad()
+        child.keys.set_state(self.keys.get_state())
+        child.memory = self.memory.fork()
+        child.random = random.Random.__new__(random.Random)
+        child.random.setstate(self.random.getstate())
+        child.quirks = self.quirks
+        child.op_table = None
+        child.decoded_opcodes = {}
+        return child
+
+    def snapshot(self):
+        """
+        Returns the complete machine state as a versioned binary blob
+        """
+        memory_size = len(self.memory.data)
+        stack_size = 2 * len(self.stack)
+        blob = bytearray(SNAPSHOT_HEADER.size + stack_size + memory_size +
+                         ROWS_STRUCT.size + RANDOM_STATE.size)
+        SNAPSHOT_HEADER.pack_into(blob, 0, SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+                                  bytes(self.registers.v), self.registers.i,
+                                  self.program_counter.value,
+                                  self.timers.delay_timer,
+                                  self.timers.sound_timer,
+                                  self.keys.get_state(), len(self.stack))
+        offset = SNAPSHOT_HEADER.size
+        struct.pack_into(f'>{len(self.stack)}H', blob, offset, *self.stack)
+        offset += stack_size
+        blob[offset:offset + memory_size] = self.memory.data
+        offset += memory_size
+        ROWS_STRUCT.pack_into(blob, offset, *self.graphics.rows)
+        offset += ROWS_STRUCT.size
+        (_, random_state, _) = self.random.getstate()
+        RANDOM_STATE.pack_into(blob, offset, *random_state)
+        return bytes(blob)
+
+    def restore(self, blob):
+        """
+        Restores state saved by snapshot, in place
+        """
+        view = memoryview(blob)
+        if len(view) < SNAPSHOT_HEADER.size:
+            raise ValueError('Truncated snapshot')
+        (magic, version, v, i, pc, delay_timer, sound_timer, key_bits,
+         stack_depth) = SNAPSHOT_HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError('Unsupported snapshot format')
+
+        # Check everything is there before changing any state
+        memory_size = len(self.memory.data)
+        if len(view) != (SNAPSHOT_HEADER.size + 2 * stack_depth +
+                         memory_size + ROWS_STRUCT.size + RANDOM_STATE.size):
+            raise ValueError('Snapshot has the wrong length')
+        if stack_depth > len(self.stack.entries):
+            raise ValueError('Snapshot stack is deeper than this machine')
+
+        offset = SNAPSHOT_HEADER.size
+        self.stack.load(struct.unpack_from(f'>{stack_depth}H', view, offset))
+        offset += 2 * stack_depth
+        self.memory.set(0, view[offset:offset + memory_size])
+        offset += memory_size
+        self.graphics.load_bytes(view[offset:offset + ROWS_STRUCT.size])
+        offset += ROWS_STRUCT.size
+        random_state = RANDOM_STATE.unpack_from(view, offset)
+        self.random.setstate((RANDOM_STATE_VERSION, random_state, None))
+
+        self.registers.v[:] = v
+        self.registers.i = i
+        self.program_counter.value = pc
+        self.timers.delay_timer = delay_timer
+        self.timers.sound_timer = sound_timer
+        self.keys.set_state(key_bits)
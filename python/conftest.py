@@ -0,0 +1,17 @@
+from io import BytesIO
+import pytest
+from chip8 import Chip8
+
+
+@pytest.fixture
+def make_chip():
+    """
+    Returns a factory for machines with program loaded at 0x200, seeded
+    so CXNN draws the same numbers on every run
+    """
+    def make(program, seed=0):
+        chip = Chip8(seed=seed)
+        chip.load_game(BytesIO(program))
+        return chip
+
+    return make
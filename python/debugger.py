@@ -0,0 +1,222 @@
+"""
+PC breakpoints, memory watchpoints and conditional breaks
+
+    debugger = Debugger(chip8)
+    debugger.add_breakpoint(0x2A4)
+    debugger.add_watchpoint(0x300, 0x310, read=True)
+    debugger.add_condition(register_equals(0xF, 1))
+    hit = debugger.run(100000)
+
+Nothing is instrumented while no breakpoint or watch is set. The first
+one replaces the machine's emulate_cycle with a checking copy, read
+watchpoints replace Memory.get and get_byte on the machine's memory,
+and write watchpoints add a Memory write listener; removing the last
+puts the plain methods back.
+"""
+from dataclasses import dataclass
+
+
+class BreakpointHit(Exception):
+    """
+    Raised from emulate_cycle when execution reaches a breakpoint, a
+    condition becomes true or a watched address is accessed
+
+    Breakpoints and conditions stop before the instruction at pc runs;
+    watchpoints stop after the instruction that made the access.
+    """
+    def __init__(self, kind, pc, address=None):
+        if address is None:
+            message = f'{kind} at 0x{pc:03X}'
+        else:
+            message = f'{kind} of 0x{address:03X} at 0x{pc:03X}'
+        super().__init__(message)
+        self.kind = kind
+        self.pc = pc
+        self.address = address
+
+
+@dataclass(frozen=True)
+class Watchpoint:
+    start: int
+    end: int
+    read: bool = False
+    write: bool = True
+
+    def overlaps(self, loc, length):
+        return self.start < loc + length and loc < self.end
+
+
+def register_equals(reg, value):
+    """
+    Returns a condition that holds when register V<reg> equals value
+    """
+    return lambda chip8: chip8.registers.v[reg] == value
+
+
+class Debugger:
+    def __init__(self, chip8):
+        self.chip8 = chip8
+        self.breakpoints = {}
+        self.conditions = []
+        self.watchpoints = []
+        self.__hits = []
+        self.__held_conditions = set()
+        self.__resume_pc = None
+        self.__saved_emulate_cycle = None
+        self.__installed = False
+        self.__watching_reads = False
+        self.__watching_writes = False
+
+    def add_breakpoint(self, pc, condition=None):
+        """
+        Stops before the instruction at pc runs, if condition is None
+        or returns True when called with the Chip8
+        """
+        self.breakpoints[pc] = condition
+        self.__update()
+
+    def remove_breakpoint(self, pc):
+        del self.breakpoints[pc]
+        self.__update()
+
+    def add_condition(self, condition):
+        """
+        Stops before the first instruction at which condition, called
+        with the Chip8, returns True, and again each time it becomes
+        True after having been False
+        """
+        self.conditions.append(condition)
+        self.__update()
+
+    def remove_condition(self, condition):
+        self.conditions.remove(condition)
+        self.__held_conditions.discard(condition)
+        self.__update()
+
+    def add_watchpoint(self, start, end=None, read=False, write=True):
+        """
+        Stops after any instruction that reads or writes memory in the
+        range start to end, exclusive, or just start if end is None
+        """
+        watchpoint = Watchpoint(start, start + 1 if end is None else end,
+                                read, write)
+        self.watchpoints.append(watchpoint)
+        self.__update()
+        return watchpoint
+
+    def remove_watchpoint(self, watchpoint):
+        self.watchpoints.remove(watchpoint)
+        self.__update()
+
+    def clear(self):
+        self.breakpoints.clear()
+        self.conditions.clear()
+        self.__held_conditions.clear()
+        self.watchpoints.clear()
+        self.__update()
+
+    def run(self, cycles):
+        """
+        Runs up to cycles instructions and returns the BreakpointHit that
+        stopped them, or None; running again resumes past the break
+        """
+        emulate_cycle = self.chip8.emulate_cycle
+        try:
+            for _ in range(cycles):
+                emulate_cycle()
+        except BreakpointHit as hit:
+            return hit
+        return None
+
+    def step(self):
+        return self.run(1)
+
+    def __update(self):
+        watching_reads = any(w.read for w in self.watchpoints)
+        watching_writes = any(w.write for w in self.watchpoints)
+        memory = self.chip8.memory
+
+        if watching_reads and not self.__watching_reads:
+            self.__watch_reads(memory)
+        elif self.__watching_reads and not watching_reads:
+            del memory.get
+            del memory.get_byte
+        self.__watching_reads = watching_reads
+
+        if watching_writes and not self.__watching_writes:
+            memory.write_listeners.append(self.__on_write)
+        elif self.__watching_writes and not watching_writes:
+            memory.write_listeners.remove(self.__on_write)
+        self.__watching_writes = watching_writes
+
+        active = bool(self.breakpoints or self.conditions or self.watchpoints)
+        if active and not self.__installed:
+            self.__install()
+        elif self.__installed and not active:
+            if self.__saved_emulate_cycle is None:
+                del self.chip8.emulate_cycle
+            else:
+                self.chip8.emulate_cycle = self.__saved_emulate_cycle
+            self.__installed = False
+
+    def __install(self):
+        chip8 = self.chip8
+        self.__saved_emulate_cycle = vars(chip8).get('emulate_cycle')
+        run_instruction = chip8.emulate_cycle
+        program_counter = chip8.program_counter
+        breakpoints = self.breakpoints
+        conditions = self.conditions
+        held_conditions = self.__held_conditions
+        hits = self.__hits
+
+        def emulate_cycle():
+            pc = program_counter.value
+            if pc != self.__resume_pc:
+                if pc in breakpoints:
+                    condition = breakpoints[pc]
+                    if condition is None or condition(chip8):
+                        self.__break('breakpoint', pc)
+                for condition in conditions:
+                    if not condition(chip8):
+                        held_conditions.discard(condition)
+                    elif condition not in held_conditions:
+                        held_conditions.add(condition)
+                        self.__break('condition', pc)
+            self.__resume_pc = None
+
+            hits.clear()
+            run_instruction()
+            if hits:
+                (kind, address) = hits[0]
+                hits.clear()
+                raise BreakpointHit(kind, pc, address)
+
+        chip8.emulate_cycle = emulate_cycle
+        self.__installed = True
+
+    def __break(self, kind, pc):
+        self.__resume_pc = pc
+        raise BreakpointHit(kind, pc)
+
+    def __watch_reads(self, memory):
+        memory_type = type(memory)
+
+        def get(loc, length):
+            self.__on_access('read', loc, length)
+            return memory_type.get(memory, loc, length)
+
+        def get_byte(loc):
+            self.__on_access('read', loc, 1)
+            return memory_type.get_byte(memory, loc)
+
+        memory.get = get
+        memory.get_byte = get_byte
+
+    def __on_write(self, loc, length):
+        self.__on_access('write', loc, length)
+
+    def __on_access(self, kind, loc, length):
+        for watchpoint in self.watchpoints:
+            if getattr(watchpoint, kind) and watchpoint.overlaps(loc, length):
+                self.__hits.append((kind, max(loc, watchpoint.start)))
+                return
@@ -0,0 +1,36 @@
+"""
+Display backends, imported only when first used
+
+    display = create_display('terminal')
+    display.show()
+    Scheduler(chip8, render=display.draw).run(should_continue=display.poll)
+
+Only the 'sdl' backend imports sdl2, so headless workers that pick
+another backend never load it.
+"""
+import importlib
+
+BACKENDS = {
+    'sdl': ('displays.sdl_display', 'SdlDisplay'),
+    'null': ('displays.null_display', 'NullDisplay'),
+    'terminal': ('displays.terminal_display', 'TerminalDisplay'),
+    'memory': ('displays.memory_display', 'MemoryDisplay'),
+}
+
+
+def register_backend(name, module_name, class_name):
+    BACKENDS[name] = (module_name, class_name)
+
+
+def create_display(name, **options):
+    if name not in BACKENDS:
+        raise ValueError(f'Unknown display backend: {name}')
+    (module_name, class_name) = BACKENDS[name]
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)(**options)
+
+
+__all__ = [
+    create_display,
+    register_backend,
+]
@@ -0,0 +1,19 @@
+class Display:
+    """
+    Somewhere to show a Graphics framebuffer
+    """
+    def show(self):
+        pass
+
+    def draw(self, graphics):
+        raise NotImplementedError
+
+    def poll(self):
+        """
+        Handles pending events and returns False once the user has
+        asked to quit
+        """
+        return True
+
+    def close(self):
+        pass
@@ -0,0 +1,51 @@
+import struct
+import zlib
+from displays.display import Display
+from graphics import HEIGHT, ROWS_STRUCT, WIDTH
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def png_chunk(chunk_type, data):
+    chunk = chunk_type + data
+    return (struct.pack('>I', len(data)) + chunk +
+            struct.pack('>I', zlib.crc32(chunk)))
+
+
+def encode_png(rows, scale=1):
+    """
+    Encodes packed framebuffer rows as a 1-bit grayscale PNG
+    """
+    scanlines = bytearray()
+    for row in rows:
+        bits = format(row, f'0{WIDTH}b')
+        scaled = int(''.join(bit * scale for bit in bits), 2)
+        scanline = b'\x00' + scaled.to_bytes(WIDTH * scale // 8, 'big')
+        scanlines += scanline * scale
+
+    header = struct.pack('>IIBBBBB', WIDTH * scale, HEIGHT * scale, 1, 0, 0,
+                         0, 0)
+    return (PNG_SIGNATURE + png_chunk(b'IHDR', header) +
+            png_chunk(b'IDAT', zlib.compress(bytes(scanlines))) +
+            png_chunk(b'IEND', b''))
+
+
+class MemoryDisplay(Display):
+    """
+    Keeps drawn frames as packed framebuffer bytes, optionally only
+    the most recent max_frames, and can save any of them as a PNG
+    """
+    def __init__(self, max_frames=None):
+        self.max_frames = max_frames
+        self.frames = []
+
+    def draw(self, graphics):
+        graphics.take_dirty_rows()
+        self.frames.append(graphics.to_bytes())
+        if self.max_frames is not None and len(self.frames) > self.max_frames:
+            del self.frames[0]
+
+    def save_png(self, path, frame=-1, scale=1):
+        rows = ROWS_STRUCT.unpack(self.frames[frame])
+        with open(path, 'wb') as png_file:
+            png_file.write(encode_png(rows, scale))
@@ -0,0 +1,9 @@
+from displays.display import Display
+
+
+class NullDisplay(Display):
+    """
+    Discards every frame
+    """
+    def draw(self, graphics):
+        graphics.take_dirty_rows()
@@ -0,0 +1,23 @@
+import sdl2
+import sdl2.ext
+from displays.display import Display
+from screen import Screen
+
+
+class SdlDisplay(Display):
+    def __init__(self, scaling=20):
+        sdl2.ext.init()
+        self.screen = Screen(scaling)
+
+    def show(self):
+        self.screen.show()
+
+    def draw(self, graphics):
+        self.screen.draw(graphics)
+
+    def poll(self):
+        events = sdl2.ext.get_events()
+        return not any(event.type == sdl2.SDL_QUIT for event in events)
+
+    def close(self):
+        sdl2.ext.quit()
@@ -0,0 +1,48 @@
+import sys
+from displays.display import Display
+from graphics import HEIGHT, WIDTH
+
+# Characters for a (top pixel, bottom pixel) pair
+HALF_BLOCKS = {
+    (0, 0): ' ',
+    (1, 0): '▀',
+    (0, 1): '▄',
+    (1, 1): '█',
+}
+
+
+class TerminalDisplay(Display):
+    """
+    Draws the framebuffer with ANSI escapes and Unicode half blocks,
+    two pixel rows per line of text, rewriting only changed lines
+    """
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.needs_full_redraw = True
+
+    def show(self):
+        self.stream.write('\x1b[2J\x1b[?25l')
+        self.stream.flush()
+
+    def draw(self, graphics):
+        dirty = graphics.take_dirty_rows()
+        if self.needs_full_redraw:
+            dirty = (0, HEIGHT)
+            self.needs_full_redraw = False
+        if dirty is None:
+            return
+
+        (first, last) = dirty
+        output = []
+        for line in range(first // 2, (last + 1) // 2):
+            top = graphics.rows[2 * line]
+            bottom = graphics.rows[2 * line + 1]
+            output.append(f'\x1b[{line + 1};1H')
+            for x in range(WIDTH - 1, -1, -1):
+                output.append(HALF_BLOCKS[(top >> x) & 1, (bottom >> x) & 1])
+        self.stream.write(''.join(output))
+        self.stream.flush()
+
+    def close(self):
+        self.stream.write(f'\x1b[{HEIGHT // 2 + 1};1H\x1b[?25h')
+        self.stream.flush()
@@ -0,0 +1,105 @@
+"""
+Framebuffer delta encoding
+
+Each frame is XORed against the previous one and only the changed
+bytes are kept:
+
+    flags: uint8            KEYFRAME if encoded against a blank screen
+    row mask: uint32        bit y set if row y changed
+    per changed row:
+        byte mask: uint8    bit 7 - n set if byte n of the row changed
+        changed bytes
+
+Frames are self-delimiting, so a recording is just encoded frames
+written back to back. A frame that changes a few sprite rows takes
+around a dozen bytes, against 256 for the packed framebuffer and 2048
+for one byte per pixel.
+"""
+import struct
+from graphics import HEIGHT, WIDTH
+
+DELTA = 0
+KEYFRAME = 1
+FRAME_HEADER = struct.Struct('>BI')
+ROW_BYTES = WIDTH // 8
+
+
+class FrameEncoder:
+    def __init__(self):
+        self.previous = None
+
+    def reset(self):
+        """
+        Makes the next frame a keyframe, for a new reader
+        """
+        self.previous = None
+
+    def encode(self, rows):
+        """
+        Encodes a frame given as its packed rows, such as Graphics.rows
+        """
+        flags = KEYFRAME if self.previous is None else DELTA
+        previous = self.previous or [0] * HEIGHT
+        encoded = bytearray(FRAME_HEADER.size)
+        row_mask = 0
+        for y in range(HEIGHT):
+            diff = rows[y] ^ previous[y]
+            if not diff:
+                continue
+            row_mask |= 1 << y
+            byte_mask_loc = len(encoded)
+            encoded.append(0)
+            byte_mask = 0
+            for (n, byte) in enumerate(diff.to_bytes(ROW_BYTES, 'big')):
+                if byte:
+                    byte_mask |= 0x80 >> n
+                    encoded.append(byte)
+            encoded[byte_mask_loc] = byte_mask
+
+        FRAME_HEADER.pack_into(encoded, 0, flags, row_mask)
+        self.previous = list(rows)
+        return bytes(encoded)
+
+
+class FrameDecoder:
+    def __init__(self):
+        self.previous = None
+
+    def decode(self, data, offset=0):
+        """
+        Decodes the frame at offset and returns its rows and the offset
+        just past it
+        """
+        (flags, row_mask) = FRAME_HEADER.unpack_from(data, offset)
+        offset += FRAME_HEADER.size
+        if flags == KEYFRAME:
+            rows = [0] * HEIGHT
+        elif self.previous is None:
+            raise ValueError('Delta frame without a preceding keyframe')
+        else:
+            rows = list(self.previous)
+
+        for y in range(HEIGHT):
+            if not row_mask & (1 << y):
+                continue
+            byte_mask = data[offset]
+            offset += 1
+            diff = 0
+            for n in range(ROW_BYTES):
+                diff <<= 8
+                if byte_mask & (0x80 >> n):
+                    diff |= data[offset]
+                    offset += 1
+            rows[y] ^= diff
+
+        self.previous = rows
+        return (rows, offset)
+
+    def decode_stream(self, data):
+        """
+        Yields the rows of every frame in a recording
+        """
+        offset = 0
+        while offset < len(data):
+            (rows, offset) = self.decode(data, offset)
+            yield rows
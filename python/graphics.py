@@ -1,50 +1,178 @@
+import struct
+
+WIDTH = 64
+HEIGHT = 32
+ROW_MASK = (1 << WIDTH) - 1
+ALL_ROWS = (1 << HEIGHT) - 1
+ROWS_STRUCT = struct.Struct(f'>{HEIGHT}Q')
+
+
+def shifted_sprite_rows(wrap):
+    """
+    Returns a table of every sprite byte pre-shifted into a packed row,
+    indexed [x][byte], with pixels past the right edge dropped or, when
+    wrap is set, carried round to the left edge
+    """
+    table = []
+    for x in range(WIDTH):
+        rows = []
+        for byte in range(256):
+            row = (byte << (WIDTH - 8)) >> x
+            if wrap:
+                row |= (byte << (2 * WIDTH - 8 - x)) & ROW_MASK
+            rows.append(row)
+        table.append(rows)
+    return table
+
+
+# shifted_sprite_rows tables keyed by wrap, each built on first use
+SPRITE_ROWS = {}
+
+
+def sprite_rows(wrap):
+    table = SPRITE_ROWS.get(wrap)
+    if table is None:
+        table = SPRITE_ROWS[wrap] = shifted_sprite_rows(wrap)
+    return table
+
+
 class Graphics:
+    """
+    Packed 64x32 monochrome framebuffer
+
+    Each row is stored as a single 64-bit integer with the leftmost
+    pixel in the most significant bit, so a sprite row can be drawn
+    with one shift, one XOR and one AND for collision detection.
+    """
     def __init__(self):
-        self.memory = []
-        for y in range(0, 32):
-            for x in range(0, 64):
-                self.memory.append(Pixel(x, y))
+        self.rows = [0] * HEIGHT
+
+        # Set whenever the framebuffer changes, reset by the renderer
+        self.should_draw = False
+
+        # Bit y is set when row y changed since the last take_dirty_rows
+        self.dirty_rows = 0
 
     def set_sprite_line(self, x, y, sprite_data):
-        collision = False
-        for i in range(8):
-            new_pixel_on = sprite_data & (0x80 >> i) != 0
-            if new_pixel_on:
-                pixel = self.pixel_at(x + i, y)
-                is_flipped = pixel.set()
-                collision = is_flipped or collision
-        return collision
+        if x < 0:
+            raise ValueError(f'Sprite line x {x} is off the screen')
+        # A line starting past the right edge is clipped away entirely
+        sprite_row = sprite_rows(False)[x][sprite_data] if x < WIDTH else 0
+        row = self.rows[y]
+        if sprite_row:
+            self.rows[y] = row ^ sprite_row
+            self.dirty_rows |= 1 << y
+            self.should_draw = True
+        return row & sprite_row != 0
+
+    def draw_sprite(self, x, y, sprite, wrap=False):
+        """
+        XORs sprite, a sequence of bytes one per row, onto the screen
+        with its top left corner at (x, y), and returns True if any lit
+        pixel was turned off
+
+        The corner always wraps onto the screen. Pixels past the right
+        and bottom edges are clipped, or wrapped round when wrap is set.
+        """
+        x %= WIDTH
+        y %= HEIGHT
+        table = sprite_rows(wrap)[x]
+        rows = self.rows
+        collision = 0
+        dirty_rows = 0
+        for sprite_data in sprite:
+            if y == HEIGHT:
+                if not wrap:
+                    break
+                y = 0
+            sprite_row = table[sprite_data]
+            if sprite_row:
+                row = rows[y]
+                rows[y] = row ^ sprite_row
+                collision |= row & sprite_row
+                dirty_rows |= 1 << y
+            y += 1
+        if dirty_rows:
+            self.dirty_rows |= dirty_rows
+            self.should_draw = True
+        return collision != 0
 
     def get_gfx_state(self, x, y, length):
-        gfx_loc = Graphics.__get_memory_loc(x, y)
-        pixels = self.memory[gfx_loc:gfx_loc + length]
-        return [1 if p.is_on else 0 for p in pixels]
+        state = []
+        for loc in range(x + (y * WIDTH), x + (y * WIDTH) + length):
+            (pixel_y, pixel_x) = divmod(loc, WIDTH)
+            state.append(self.__bit(pixel_x, pixel_y))
+        return state
 
     def clear(self):
-        for pixel in self.memory:
-            pixel.clear()
+        for (y, row) in enumerate(self.rows):
+            if row:
+                self.dirty_rows |= 1 << y
+        self.rows = [0] * HEIGHT
+        self.should_draw = True
+
+    def mark_dirty(self, y):
+        self.dirty_rows |= 1 << y
+        self.should_draw = True
+
+    def take_dirty_rows(self):
+        """
+        Returns the range of rows changed since the last call, as a
+        (first, last + 1) tuple, or None if nothing changed
+        """
+        dirty_rows = self.dirty_rows
+        if not dirty_rows:
+            return None
+        self.dirty_rows = 0
+        first = (dirty_rows & -dirty_rows).bit_length() - 1
+        return (first, dirty_rows.bit_length())
+
+    def to_bytes(self):
+        return ROWS_STRUCT.pack(*self.rows)
+
+    def load_rows(self, rows):
+        self.rows = list(rows)
+        self.dirty_rows = ALL_ROWS
+        self.should_draw = True
+
+    def load_bytes(self, data):
+        self.load_rows(ROWS_STRUCT.unpack(data))
 
     def pixels(self):
-        return self.memory
+        return [Pixel(self, x, y) for y in range(HEIGHT) for x in range(WIDTH)]
 
     def pixel_at(self, x, y):
-        loc = Graphics.__get_memory_loc(x, y)
-        return self.memory[loc]
+        return Pixel(self, x % WIDTH, y % HEIGHT)
 
-    def __get_memory_loc(x, y):
-        return x + (y * 64)
+    def __bit(self, x, y):
+        return (self.rows[y] >> (WIDTH - 1 - x)) & 1
 
 
 class Pixel:
-    def __init__(self, x, y, is_on=False):
+    """
+    View of a single pixel in a Graphics framebuffer
+    """
+    __slots__ = ('graphics', 'x', 'y')
+
+    def __init__(self, graphics, x, y):
+        self.graphics = graphics
         self.x = x
         self.y = y
-        self.is_on = is_on
+
+    @property
+    def is_on(self):
+        return (self.graphics.rows[self.y] >> self.__shift()) & 1 == 1
 
     def set(self):
         is_flipped = self.is_on
-        self.is_on = not self.is_on
+        self.graphics.rows[self.y] ^= 1 << self.__shift()
+        self.graphics.mark_dirty(self.y)
         return is_flipped
 
     def clear(self):
-        self.is_on = False
+        if self.is_on:
+            self.graphics.rows[self.y] &= ~(1 << self.__shift()) & ROW_MASK
+            self.graphics.mark_dirty(self.y)
+
+    def __shift(self):
+        return WIDTH - 1 - self.x
@@ -0,0 +1,148 @@
+from util import get_opcode_digits
+
+# Longest loop, in instructions, considered for idle detection
+MAX_IDLE_LOOP = 4
+
+# Kinds of loop head, see IdleSkipper.run
+NOT_A_LOOP = (0, None)
+LOOP = 1
+IDEMPOTENT_LOOP = 2
+
+
+def is_idle_opcode(opcode):
+    """
+    Returns True for opcodes that can only change V registers and the
+    program counter, as a function of the timers and keypad
+    """
+    (first, _, _, n) = get_opcode_digits(opcode)
+    nn = opcode & 0x00FF
+    return (first in (0x3, 0x4, 0x6)
+            or (first in (0x5, 0x9) and n == 0)
+            or (first == 0xE and nn in (0x9E, 0xA1))
+            or (first == 0xF and nn in (0x07, 0x0A)))
+
+
+def register_effects(opcode):
+    """
+    Returns (registers read, register written or None) for an idle
+    opcode
+    """
+    (first, x, y, _) = get_opcode_digits(opcode)
+    if first in (0x5, 0x9):
+        return ({x, y}, None)
+    if first in (0x3, 0x4, 0xE):
+        return ({x}, None)
+    if first == 0x6 or opcode & 0xF0FF == 0xF007:
+        return (set(), x)
+    return (set(), None)
+
+
+def is_idempotent(opcodes):
+    """
+    Returns True if running the loop body twice in a row always leaves
+    the registers as running it once does: every register the body
+    reads is either never written in it or always written before being
+    read
+    """
+    written = {register_effects(opcode)[1] for opcode in opcodes}
+    written_first = set()
+    after_skip = False
+    for opcode in opcodes:
+        (reads, write) = register_effects(opcode)
+        if reads & written - written_first:
+            return False
+        if write is not None and not after_skip:
+            written_first.add(write)
+        after_skip = opcode >> 12 in (0x3, 0x4, 0x5, 0x9, 0xE)
+    return True
+
+
+class IdleSkipper:
+    """
+    Runs a Chip8 like Recompiler.run, but skips the cycles a ROM spends
+    spinning in an idle loop
+
+    An idle loop is FX0A waiting for a key, a jump to itself, or a short
+    loop back to its own start made only of timer reads, key checks,
+    register loads and skips, such as FX07, 3X00, 1NNN waiting on the
+    delay timer. When one iteration of such a loop leaves the registers
+    as it found them, or the loop always overwrites what it reads so any
+    one iteration settles them, every later iteration does the same
+    until a key or timer changes. That can only happen between calls to
+    run, so the remaining whole iterations are skipped in one step and
+    only the leftover partial iteration is executed, keeping the machine
+    exactly where a plain interpreter would be. An iteration that leaves
+    the verified loop body, for example by skipping over the jump, is
+    never skipped.
+    """
+    def __init__(self, chip8):
+        self.chip8 = chip8
+        self.skipped_cycles = 0
+        self.loop_heads = {}
+        chip8.memory.write_listeners.append(self.invalidate)
+
+    def run(self, cycles):
+        chip8 = self.chip8
+        program_counter = chip8.program_counter
+        registers = chip8.registers
+        v = registers.v
+        emulate_cycle = chip8.emulate_cycle
+        loop_heads = self.loop_heads
+
+        remaining = cycles
+        while remaining > 0:
+            pc = program_counter.value
+            loop = loop_heads.get(pc)
+            if loop is None:
+                loop = loop_heads[pc] = self.__find_loop(pc)
+            if loop is NOT_A_LOOP:
+                emulate_cycle()
+                remaining -= 1
+                continue
+
+            # Instructions from pc to end, the jump back, were verified
+            (kind, end) = loop
+            before = (bytes(v), registers.i)
+            length = 0
+            in_body = True
+            while remaining > 0 and length < MAX_IDLE_LOOP:
+                emulate_cycle()
+                remaining -= 1
+                length += 1
+                if not pc <= program_counter.value <= end:
+                    in_body = False
+                    break
+                if program_counter.value == pc:
+                    break
+            if in_body and program_counter.value == pc and (
+                    kind == IDEMPOTENT_LOOP
+                    or (bytes(v), registers.i) == before):
+                skipped = remaining - remaining % length
+                remaining -= skipped
+                self.skipped_cycles += skipped
+        return cycles
+
+    def invalidate(self, loc, length):
+        if self.loop_heads:
+            self.loop_heads.clear()
+
+    def __find_loop(self, start):
+        data = self.chip8.memory.data
+        loc = start
+        body = []
+        for _ in range(MAX_IDLE_LOOP):
+            if loc + 1 >= len(data):
+                return NOT_A_LOOP
+            opcode = (data[loc] << 8) | data[loc + 1]
+            if opcode >> 12 == 0x1:
+                if opcode & 0x0FFF != start:
+                    return NOT_A_LOOP
+                kind = IDEMPOTENT_LOOP if is_idempotent(body) else LOOP
+                return (kind, loc)
+            if opcode & 0xF0FF == 0xF00A:
+                return (LOOP, loc) if loc == start else NOT_A_LOOP
+            if not is_idle_opcode(opcode):
+                return NOT_A_LOOP
+            body.append(opcode)
+            loc += 2
+        return NOT_A_LOOP
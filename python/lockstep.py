@@ -0,0 +1,383 @@
+"""
+Lockstep batch emulator
+
+Holds the state of many Chip-8 machines in NumPy arrays and steps them
+together, grouping machines by the opcode family they are executing so
+every family is applied as a handful of vectorized operations.
+
+A machine that would raise in Chip8.emulate_cycle (an unknown opcode,
+a stack underflow, a sprite read past the end of memory, ...) is
+marked as faulted and stops executing instead.
+
+CXNN draws from a NumPy generator owned by the batch, so ROMs that use
+it do not produce the same values as the global random module.
+
+    python lockstep.py   # throughput benchmark
+"""
+import time
+from io import BytesIO
+import numpy as np
+from chip8 import Chip8, Quirks
+from graphics import HEIGHT, WIDTH
+from memory import Memory
+from stack import STACK_DEPTH
+
+
+class LockstepBatch:
+    def __init__(self, count, seed=None, quirks=None):
+        self.count = count
+        self.quirks = quirks if quirks is not None else Quirks()
+        fontset = np.frombuffer(bytes(Memory().data), dtype=np.uint8)
+        self.memory = np.tile(fontset, (count, 1))
+        self.v = np.zeros((count, 16), dtype=np.int64)
+        self.i = np.zeros(count, dtype=np.int64)
+        self.pc = np.full(count, 0x200, dtype=np.int64)
+        self.stack = np.zeros((count, STACK_DEPTH), dtype=np.int64)
+        self.sp = np.zeros(count, dtype=np.int64)
+        self.delay_timer = np.zeros(count, dtype=np.int64)
+        self.sound_timer = np.zeros(count, dtype=np.int64)
+        self.keys = np.zeros((count, 16), dtype=bool)
+        self.rows = np.zeros((count, HEIGHT), dtype=np.uint64)
+        self.faulted = np.zeros(count, dtype=bool)
+        self.rng = np.random.default_rng(seed)
+
+        self.op_table = [
+            self.op_0xxx, self.op_1xxx, self.op_2xxx, self.op_3xxx,
+            self.op_4xxx, self.op_5xxx, self.op_6xxx, self.op_7xxx,
+            self.op_8xxx, self.op_9xxx, self.op_axxx, self.op_bxxx,
+            self.op_cxxx, self.op_dxxx, self.op_exxx, self.op_fxxx
+        ]
+
+    def load_game(self, program_data):
+        self.memory[:, 512:512 + len(program_data)] = np.frombuffer(
+            program_data, dtype=np.uint8)
+
+    def load(self, index, chip8):
+        """
+        Copies the state of a Chip8 into machine index
+        """
+        if len(chip8.stack) > STACK_DEPTH:
+            raise ValueError('Call stack deeper than the batch stack')
+        self.memory[index] = np.frombuffer(bytes(chip8.memory.data),
+                                           dtype=np.uint8)
+        self.v[index] = list(chip8.registers.v)
+        self.i[index] = chip8.registers.i
+        self.pc[index] = chip8.program_counter.value
+        self.stack[index] = 0
+        self.stack[index, :len(chip8.stack)] = list(chip8.stack)
+        self.sp[index] = len(chip8.stack)
+        self.delay_timer[index] = chip8.timers.delay_timer
+        self.sound_timer[index] = chip8.timers.sound_timer
+        self.keys[index] = [chip8.keys.is_pressed(k) for k in range(16)]
+        self.rows[index] = chip8.graphics.rows
+        self.faulted[index] = False
+
+    def store(self, index, chip8):
+        """
+        Copies the state of machine index into a Chip8
+        """
+        chip8.memory.set(0, self.memory[index].tobytes())
+        chip8.registers.v[:] = bytes(self.v[index].astype(np.uint8))
+        chip8.registers.i = int(self.i[index])
+        chip8.program_counter.value = int(self.pc[index])
+        chip8.stack.load([int(s) for s in self.stack[index, :self.sp[index]]])
+        chip8.timers.delay_timer = int(self.delay_timer[index])
+        chip8.timers.sound_timer = int(self.sound_timer[index])
+        for key_num in range(16):
+            if self.keys[index, key_num]:
+                chip8.keys.press_key(key_num)
+            else:
+                chip8.keys.release_key(key_num)
+        chip8.graphics.load_rows(int(row) for row in self.rows[index])
+
+    def step(self):
+        """
+        Executes one cycle on every machine that has not faulted
+        """
+        active = np.flatnonzero(~self.faulted)
+        pc = self.pc[active]
+        out_of_range = pc + 1 >= self.memory.shape[1]
+        self.fault(active[out_of_range])
+        active = active[~out_of_range]
+        pc = pc[~out_of_range]
+
+        opcodes = (self.memory[active, pc].astype(np.int64) << 8) \
+            | self.memory[active, pc + 1]
+        families = opcodes >> 12
+        for family in np.unique(families):
+            selected = families == family
+            self.op_table[family](active[selected], opcodes[selected])
+
+    def tick_timers(self):
+        """
+        Counts every machine's timers down once, at 60hz
+        """
+        self.delay_timer = np.maximum(self.delay_timer - 1, 0)
+        self.sound_timer = np.maximum(self.sound_timer - 1, 0)
+
+    def run(self, cycles):
+        for _ in range(cycles):
+            self.step()
+
+    def fault(self, idx):
+        self.faulted[idx] = True
+
+    def skip_if(self, idx, condition):
+        self.pc[idx] += np.where(condition, 4, 2)
+
+    def op_0xxx(self, idx, op):
+        clear = (op & 0x000F) == 0
+        cleared = idx[clear]
+        self.rows[cleared] = 0
+        self.pc[cleared] += 2
+
+        returning = idx[~clear]
+        underflow = self.sp[returning] == 0
+        self.fault(returning[underflow])
+        returning = returning[~underflow]
+        self.sp[returning] -= 1
+        self.pc[returning] = self.stack[returning, self.sp[returning]] + 2
+
+    def op_1xxx(self, idx, op):
+        self.pc[idx] = op & 0x0FFF
+
+    def op_2xxx(self, idx, op):
+        overflow = self.sp[idx] == STACK_DEPTH
+        self.fault(idx[overflow])
+        idx = idx[~overflow]
+        op = op[~overflow]
+        self.stack[idx, self.sp[idx]] = self.pc[idx]
+        self.sp[idx] += 1
+        self.pc[idx] = op & 0x0FFF
+
+    def op_3xxx(self, idx, op):
+        self.skip_if(idx, self.v[idx, (op >> 8) & 0xF] == op & 0x00FF)
+
+    def op_4xxx(self, idx, op):
+        self.skip_if(idx, self.v[idx, (op >> 8) & 0xF] != op & 0x00FF)
+
+    def op_5xxx(self, idx, op):
+        x_values = self.v[idx, (op >> 8) & 0xF]
+        y_values = self.v[idx, (op >> 4) & 0xF]
+        self.skip_if(idx, x_values == y_values)
+
+    def op_6xxx(self, idx, op):
+        self.v[idx, (op >> 8) & 0xF] = op & 0x00FF
+        self.pc[idx] += 2
+
+    def op_7xxx(self, idx, op):
+        x_reg = (op >> 8) & 0xF
+        self.v[idx, x_reg] = (self.v[idx, x_reg] + (op & 0x00FF)) % 256
+        self.pc[idx] += 2
+
+    def op_8xxx(self, idx, op):
+        operation = op & 0x000F
+        invalid = (operation > 7) & (operation != 0xE)
+        self.fault(idx[invalid])
+
+        for sub_op in np.unique(operation[~invalid]):
+            selected = operation == sub_op
+            ii = idx[selected]
+            x_reg = (op[selected] >> 8) & 0xF
+            x_value = self.v[ii, x_reg]
+            y_value = self.v[ii, (op[selected] >> 4) & 0xF]
+            carry = None
+            if sub_op == 0x0:
+                result = y_value
+            elif sub_op == 0x1:
+                result = x_value | y_value
+            elif sub_op == 0x2:
+                result = x_value & y_value
+            elif sub_op == 0x3:
+                result = x_value ^ y_value
+            elif sub_op == 0x4:
+                result = x_value + y_value
+                carry = result > 255
+            elif sub_op == 0x5:
+                result = x_value - y_value
+                carry = result < 0
+            elif sub_op == 0x6:
+                result = x_value >> 1
+                carry = x_value % 2
+            elif sub_op == 0x7:
+                result = y_value - x_value
+                carry = result < 0
+            else:
+                result = x_value << 1
+                carry = x_value >> 7
+            self.v[ii, x_reg] = result % 256
+            if carry is not None:
+                self.v[ii, 0xF] = carry
+            self.pc[ii] += 2
+
+    def op_9xxx(self, idx, op):
+        x_values = self.v[idx, (op >> 8) & 0xF]
+        y_values = self.v[idx, (op >> 4) & 0xF]
+        self.skip_if(idx, x_values != y_values)
+
+    def op_axxx(self, idx, op):
+        self.i[idx] = op & 0x0FFF
+        self.pc[idx] += 2
+
+    def op_bxxx(self, idx, op):
+        self.pc[idx] = self.v[idx, 0] + (op & 0x0FFF)
+
+    def op_cxxx(self, idx, op):
+        random_values = self.rng.integers(0, 256, len(idx))
+        self.v[idx, (op >> 8) & 0xF] = (op & 0x00FF) & random_values
+        self.pc[idx] += 2
+
+    def op_dxxx(self, idx, op):
+        x_coord = (self.v[idx, (op >> 8) & 0xF] % WIDTH).astype(np.uint64)
+        y_coord = self.v[idx, (op >> 4) & 0xF] % HEIGHT
+        height = op & 0xF
+        wrap = not self.quirks.clip_sprites
+        drawing = np.ones(len(idx), dtype=bool)
+        self.v[idx, 0xF] = 0
+
+        for line_num in range(int(height.max(initial=0))):
+            selected = np.flatnonzero(drawing & (height > line_num))
+            ii = idx[selected]
+            address = self.i[ii] + line_num
+            invalid = address >= self.memory.shape[1]
+            self.fault(ii[invalid])
+            drawing[selected[invalid]] = False
+            selected = selected[~invalid]
+            ii = ii[~invalid]
+            address = address[~invalid]
+
+            y = y_coord[selected] + line_num
+            if wrap:
+                y %= HEIGHT
+            else:
+                visible = y < HEIGHT
+                selected = selected[visible]
+                ii = ii[visible]
+                y = y[visible]
+                address = address[visible]
+
+            x = x_coord[selected]
+            sprite = self.memory[ii, address].astype(np.uint64)
+            sprite_row = (sprite << np.uint64(56)) >> x
+            if wrap:
+                # Shifting a uint64 wraps, dropping the bits that stayed
+                # on screen; only sprites starting past x = 56 spill over
+                spill = (sprite << np.minimum(np.uint64(120) - x,
+                                              np.uint64(63)))
+                sprite_row |= np.where(x > 56, spill, np.uint64(0))
+            row = self.rows[ii, y]
+            self.rows[ii, y] = row ^ sprite_row
+            self.v[ii[(row & sprite_row) != 0], 0xF] = 1
+
+        self.pc[idx[drawing]] += 2
+
+    def op_exxx(self, idx, op):
+        key_num = self.v[idx, (op >> 8) & 0xF]
+        invalid = key_num > 15
+        self.fault(idx[invalid])
+        idx = idx[~invalid]
+        op = op[~invalid]
+        pressed = self.keys[idx, key_num[~invalid]]
+        self.skip_if(idx, np.where((op & 0x000F) == 0xE, pressed, ~pressed))
+
+    def op_fxxx(self, idx, op):
+        x_reg = (op >> 8) & 0xF
+        operation = op & 0x00FF
+        known = np.isin(operation,
+                        [0x07, 0x0A, 0x15, 0x18, 0x1E, 0x29, 0x33, 0x55, 0x65])
+        self.fault(idx[~known])
+        memory_size = self.memory.shape[1]
+
+        # FX33 writes 3 bytes at I, FX55/FX65 transfer X + 1 bytes
+        length = np.where(operation == 0x33, 3, x_reg + 1)
+        out_of_range = np.isin(operation, [0x33, 0x55, 0x65]) \
+            & (self.i[idx] + length > memory_size)
+        self.fault(idx[out_of_range])
+        operation = np.where(out_of_range, -1, operation)
+
+        selected = operation == 0x07
+        ii = idx[selected]
+        self.v[ii, x_reg[selected]] = self.delay_timer[ii]
+
+        selected = operation == 0x0A
+        ii = idx[selected]
+        any_pressed = self.keys[ii].any(axis=1)
+        ii = ii[any_pressed]
+        self.v[ii, x_reg[selected][any_pressed]] = \
+            self.keys[ii].argmax(axis=1)
+        self.pc[ii] += 2
+
+        selected = operation == 0x15
+        ii = idx[selected]
+        self.delay_timer[ii] = self.v[ii, x_reg[selected]]
+
+        selected = operation == 0x18
+        ii = idx[selected]
+        self.sound_timer[ii] = self.v[ii, x_reg[selected]]
+
+        selected = operation == 0x1E
+        ii = idx[selected]
+        self.i[ii] = (self.i[ii] + self.v[ii, x_reg[selected]]) % 256
+
+        selected = operation == 0x29
+        ii = idx[selected]
+        self.i[ii] = self.v[ii, x_reg[selected]] * 5
+
+        selected = operation == 0x33
+        ii = idx[selected]
+        value = self.v[ii, x_reg[selected]]
+        address = self.i[ii]
+        self.memory[ii, address] = value // 100
+        self.memory[ii, address + 1] = (value // 10) % 10
+        self.memory[ii, address + 2] = value % 10
+
+        for (opcode_end, storing) in ((0x55, True), (0x65, False)):
+            selected = operation == opcode_end
+            ii = idx[selected]
+            last_reg = x_reg[selected]
+            for reg in range(16):
+                jj = ii[last_reg >= reg]
+                if storing:
+                    self.memory[jj, self.i[jj] + reg] = self.v[jj, reg]
+                else:
+                    self.v[jj, reg] = self.memory[jj, self.i[jj] + reg]
+            if self.quirks.load_store_increments_i:
+                self.i[ii] += last_reg + 1
+
+        advancing = np.isin(operation,
+                            [0x07, 0x15, 0x18, 0x1E, 0x29, 0x33, 0x55, 0x65])
+        self.pc[idx[advancing]] += 2
+
+
+BENCHMARK_PROGRAM = bytes([
+    0x60, 0x05, 0x61, 0x03, 0x80, 0x14, 0x81, 0x05,
+    0x82, 0x06, 0xA0, 0x00, 0xD1, 0x25, 0xF0, 0x29,
+    0x30, 0x08, 0x70, 0x01, 0x12, 0x04
+])
+
+
+def benchmark(counts=(1, 64, 1024, 8192), cycles=200):
+    print(f'{"machines":>8} {"lockstep ips":>14} {"separate ips":>14}')
+    for count in counts:
+        batch = LockstepBatch(count)
+        batch.load_game(BENCHMARK_PROGRAM)
+        start = time.perf_counter()
+        batch.run(cycles)
+        lockstep_ips = count * cycles / (time.perf_counter() - start)
+
+        chips = []
+        for _ in range(count):
+            chip8 = Chip8()
+            chip8.load_game(BytesIO(BENCHMARK_PROGRAM))
+            chips.append(chip8)
+        start = time.perf_counter()
+        for chip8 in chips:
+            for _ in range(cycles):
+                chip8.emulate_cycle()
+        separate_ips = count * cycles / (time.perf_counter() - start)
+
+        print(f'{count:>8} {lockstep_ips:>14,.0f} {separate_ips:>14,.0f}')
+
+
+if __name__ == '__main__':
+    benchmark()
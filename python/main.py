@@ -1,46 +1,46 @@
+import argparse
 from io import BytesIO
 import sys
-import sdl2
-import sdl2.ext
 from chip8 import Chip8
-from screen import Screen
+from displays import create_display
+from scheduler import Scheduler
+from timing import TimingModel
 
 SCALING = 20
+CPU_HZ = 700
 
 
-def draw_graphics(chip8, screen):
-    if not chip8.graphics.should_draw:
-        return
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Chip-8 emulator')
+    parser.add_argument('rom', nargs='?')
+    parser.add_argument('--display', default='sdl',
+                        help='sdl, terminal, memory or null')
+    parser.add_argument('--cosmac-vip', action='store_true',
+                        help='pace instructions with COSMAC VIP timings')
+    args = parser.parse_args(argv)
 
-        screen.clear()
-        pixels = chip8.graphics.pixels()
-        set_pixels = (px for px in pixels if px.is_on)
-        for px in set_pixels:
-            screen.draw_pixel(px.x, px.y)
-
-
-def main():
-    sdl2.ext.init()
-    screen = Screen(SCALING)
-    screen.show()
+    options = {'scaling': SCALING} if args.display == 'sdl' else {}
+    display = create_display(args.display, **options)
+    display.show()
 
     chip8 = Chip8()
-    program = BytesIO(b'\xD2\x33')
-    chip8.registers.i = 80
-    chip8.memory.set(80, b'\x3C\xC3\xFF')
-    chip8.load_game(program)
-    chip8.emulate_cycle()
-
-    screen.draw(chip8.graphics.pixels())
-
-    running = True
-    while running:
-        events = sdl2.ext.get_events()
-        for event in events:
-            if event.type == sdl2.SDL_QUIT:
-                running = False
-                break
-    sdl2.ext.quit()
+    if args.rom:
+        with open(args.rom, 'rb') as program_file:
+            chip8.load_game(program_file)
+    else:
+        program = BytesIO(b'\xD2\x33\x12\x02')
+        chip8.registers.i = 80
+        chip8.memory.set(80, b'\x3C\xC3\xFF')
+        chip8.load_game(program)
+
+    timing = TimingModel.cosmac_vip() if args.cosmac_vip else None
+    scheduler = Scheduler(chip8, CPU_HZ, render=display.draw, timing=timing)
+    try:
+        scheduler.run(should_continue=display.poll)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        display.close()
     return 0
 
 
@@ -1,3 +1,6 @@
+MEMORY_SIZE = 4096
+PROGRAM_START = 0x200
+
 chip8_fontset = ([
     0xF0, 0x90, 0x90, 0x90, 0xF0,  # 0
     0x20, 0x60, 0x20, 0x20, 0x70,  # 1
@@ -18,25 +21,84 @@ chip8_fontset = ([
 ])
 
 
+def build_image(program_data):
+    """
+    Returns the initial memory contents for a program: font set,
+    then the program at PROGRAM_START
+    """
+    if len(program_data) > MEMORY_SIZE - PROGRAM_START:
+        raise ValueError('Program does not fit in memory')
+    image = bytearray(MEMORY_SIZE)
+    image[0:80] = chip8_fontset
+    image[PROGRAM_START:PROGRAM_START + len(program_data)] = program_data
+    return bytes(image)
+
+
 class Memory:
     def __init__(self):
-        self.data = bytearray(4056)
+        self.data = bytearray(MEMORY_SIZE)
         self.data[0:80] = chip8_fontset
 
+        # Callables taking (loc, length), notified after every write
+        self.write_listeners = []
+
+        # When shared, data is a buffer that other Memory instances may
+        # also be reading, such as a bytes object or a view of shared
+        # memory; it is copied on the first write
+        self.shared = False
+
+    @classmethod
+    def from_image(cls, image):
+        """
+        Returns a Memory reading from image without copying it
+        """
+        memory = cls.__new__(cls)
+        memory.data = image
+        memory.write_listeners = []
+        memory.shared = True
+        return memory
+
+    def fork(self):
+        """
+        Returns a Memory sharing this one's contents until either writes
+        """
+        if not self.shared:
+            self.data = bytes(self.data)
+            self.shared = True
+        return Memory.from_image(self.data)
+
     def load(self, program_data):
-        self.data[512:512 + len(program_data)] = program_data
+        if len(program_data) > MEMORY_SIZE - PROGRAM_START:
+            raise ValueError('Program does not fit in memory')
+        self.set(PROGRAM_START, program_data)
 
     def set(self, loc, new_data):
+        if loc + len(new_data) > len(self.data):
+            raise IndexError('Memory write out of range')
+        if self.shared:
+            self.__unshare()
         self.data[loc:loc + len(new_data)] = new_data
+        for listener in self.write_listeners:
+            listener(loc, len(new_data))
 
     def set_byte(self, loc, new_byte):
+        if self.shared:
+            self.__unshare()
         self.data[loc] = new_byte
+        for listener in self.write_listeners:
+            listener(loc, 1)
 
     def get(self, loc, length):
+        if loc + length > len(self.data):
+            raise IndexError('Memory read out of range')
         return self.data[loc:loc + length]
 
     def get_byte(self, loc):
         return self.data[loc]
 
     def char_address(self, char):
-        return char * 5
\ No newline at end of file
+        return char * 5
+
+    def __unshare(self):
+        self.data = bytearray(self.data)
+        self.shared = False
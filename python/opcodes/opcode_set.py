@@ -2,11 +2,23 @@ class OpcodeSet:
     def __init__(self, chip8):
         self.program_counter = chip8.program_counter
         self.registers = chip8.registers
+        # The register file is allocated once per machine and only ever
+        # updated in place, so handlers can hold on to it directly
+        self.v = chip8.registers.v
         self.timers = chip8.timers
         self.stack = chip8.stack
         self.keypad = chip8.keys
         self.graphics = chip8.graphics
         self.memory = chip8.memory
+        self.random = chip8.random
+        self.quirks = chip8.quirks
 
-    def execute(self, opcode):
+    def decode(self, opcode):
+        """
+        Returns a handler that takes no arguments and executes opcode,
+        with the operands already extracted from the opcode
+        """
         raise NotImplementedError
+
+    def execute(self, opcode):
+        self.decode(opcode)()
@@ -1,3 +1,4 @@
+from functools import partial
 from opcodes.opcode_set import OpcodeSet
 from util import get_opcode_digits
 
@@ -11,43 +12,64 @@ class OpcodeSetFxxx(OpcodeSet):
             0x15: self.set_delay_timer_fx15,
             0x18: self.set_sound_timer_fx18,
             0x1e: self.add_to_address_register_fx1e,
-            0x29: self.move_to_char_address_fx29
+            0x29: self.move_to_char_address_fx29,
+            0x33: self.store_bcd_fx33,
+            0x55: self.store_registers_fx55,
+            0x65: self.load_registers_fx65
         }
 
-    def execute(self, opcode):
+    def decode(self, opcode):
         (_, x_reg, _, _) = get_opcode_digits(opcode)
         opcode_end = opcode & 0x00FF
         op = self.operation_table[opcode_end]
-        op(x_reg)
+        return partial(op, x_reg)
 
     def get_delay_timer_fx07(self, x_reg):
         timer_value = self.timers.delay_timer
-        self.registers.v[x_reg] = timer_value
+        self.v[x_reg] = timer_value
         self.program_counter.next()
 
     def get_key_fx0a(self, x_reg):
         pressed_keys = self.keypad.pressed_keys()
         if len(pressed_keys) > 0:
             first_pressed = pressed_keys[0]
-            self.registers.v[x_reg] = first_pressed
+            self.v[x_reg] = first_pressed
             self.program_counter.next()
 
     def set_delay_timer_fx15(self, x_reg):
-        new_timer_value = self.registers.v[x_reg]
+        new_timer_value = self.v[x_reg]
         self.timers.delay_timer = new_timer_value
         self.program_counter.next()
 
     def set_sound_timer_fx18(self, x_reg):
-        new_timer_value = self.registers.v[x_reg]
+        new_timer_value = self.v[x_reg]
         self.timers.sound_timer = new_timer_value
         self.program_counter.next()
 
     def add_to_address_register_fx1e(self, x_reg):
-        add_value = self.registers.v[x_reg]
+        add_value = self.v[x_reg]
         self.registers.i = (self.registers.i + add_value) % 256
         self.program_counter.next()
 
     def move_to_char_address_fx29(self, x_reg):
-        char = self.registers.v[x_reg]
+        char = self.v[x_reg]
         self.registers.i = self.memory.char_address(char)
-        self.program_counter.next()
\ No newline at end of file
+        self.program_counter.next()
+
+    def store_bcd_fx33(self, x_reg):
+        value = self.v[x_reg]
+        digits = bytes((value // 100, (value // 10) % 10, value % 10))
+        self.memory.set(self.registers.i, digits)
+        self.program_counter.next()
+
+    def store_registers_fx55(self, x_reg):
+        self.memory.set(self.registers.i, self.v[:x_reg + 1])
+        if self.quirks.load_store_increments_i:
+            self.registers.i += x_reg + 1
+        self.program_counter.next()
+
+    def load_registers_fx65(self, x_reg):
+        self.v[:x_reg + 1] = self.memory.get(self.registers.i, x_reg + 1)
+        if self.quirks.load_store_increments_i:
+            self.registers.i += x_reg + 1
+        self.program_counter.next()
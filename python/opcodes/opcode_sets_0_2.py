@@ -1,3 +1,4 @@
+from functools import partial
 from opcodes.opcode_set import OpcodeSet
 
 
@@ -6,11 +7,10 @@ class OpcodeSet0xxx(OpcodeSet):
     00E0: Clears the screen
     00EE: Returns from a subroutine
     """
-    def execute(self, opcode):
+    def decode(self, opcode):
         if opcode & 0x000F == 0:
-            self.clear_screen_00e0()
-        else:
-            self.subroutine_return_00ee()
+            return self.clear_screen_00e0
+        return self.subroutine_return_00ee
 
     def clear_screen_00e0(self):
         self.graphics.clear()
@@ -25,8 +25,10 @@ class OpcodeSet1xxx(OpcodeSet):
     """
     1NNN: Jump to address NNN
     """
-    def execute(self, opcode):
-        address = opcode & 0x0FFF
+    def decode(self, opcode):
+        return partial(self.jump_1nnn, opcode & 0x0FFF)
+
+    def jump_1nnn(self, address):
         self.program_counter.jump(address)
 
 
@@ -34,6 +36,9 @@ class OpcodeSet2xxx(OpcodeSet):
     """
     2NNN: Call subroutine as NNN
     """
-    def execute(self, opcode):
-        self.stack.append(self.program_counter.value)
-        self.program_counter.jump(opcode & 0x0FFF)
+    def decode(self, opcode):
+        return partial(self.call_subroutine_2nnn, opcode & 0x0FFF)
+
+    def call_subroutine_2nnn(self, address):
+        self.stack.push(self.program_counter.value)
+        self.program_counter.jump(address)
@@ -1,3 +1,4 @@
+from functools import partial
 from opcodes.opcode_set import OpcodeSet
 from util import get_opcode_digits
 
@@ -6,10 +7,12 @@ class OpcodeSet3xxx(OpcodeSet):
     """
     3XNN: Skips next instruction if VX == NN
     """
-    def execute(self, opcode):
+    def decode(self, opcode):
         (_, reg, _, _) = get_opcode_digits(opcode)
-        value = opcode & 0x00FF
-        if self.registers.v[reg] == value:
+        return partial(self.skip_if_equal_3xnn, reg, opcode & 0x00FF)
+
+    def skip_if_equal_3xnn(self, reg, value):
+        if self.v[reg] == value:
             self.program_counter.skip()
         else:
             self.program_counter.next()
@@ -19,10 +22,12 @@ class OpcodeSet4xxx(OpcodeSet):
     """
     4XNN: Skips next instruction if VX != NN
     """
-    def execute(self, opcode):
+    def decode(self, opcode):
         (_, reg, _, _) = get_opcode_digits(opcode)
-        value = opcode & 0x00FF
-        if self.registers.v[reg] != value:
+        return partial(self.skip_if_not_equal_4xnn, reg, opcode & 0x00FF)
+
+    def skip_if_not_equal_4xnn(self, reg, value):
+        if self.v[reg] != value:
             self.program_counter.skip()
         else:
             self.program_counter.next()
@@ -32,10 +37,12 @@ class OpcodeSet5xxx(OpcodeSet):
     """
     5XY0: Skips next instruction if VX == VY
     """
-    def execute(self, opcode):
+    def decode(self, opcode):
         (_, x_reg, y_reg, _) = get_opcode_digits(opcode)
+        return partial(self.skip_if_registers_equal_5xy0, x_reg, y_reg)
 
-        if self.registers.v[x_reg] == self.registers.v[y_reg]:
+    def skip_if_registers_equal_5xy0(self, x_reg, y_reg):
+        if self.v[x_reg] == self.v[y_reg]:
             self.program_counter.skip()
         else:
             self.program_counter.next()
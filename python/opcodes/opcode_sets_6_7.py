@@ -1,3 +1,4 @@
+from functools import partial
 from opcodes.opcode_set import OpcodeSet
 from util import get_opcode_digits
 
@@ -6,10 +7,12 @@ class OpcodeSet6xxx(OpcodeSet):
     """
     6XNN: Sets VX to NN
     """
-    def execute(self, opcode):
+    def decode(self, opcode):
         (_, reg, _, _) = get_opcode_digits(opcode)
-        value = opcode & 0x00FF
-        self.registers.v[reg] = value
+        return partial(self.set_register_6xnn, reg, opcode & 0x00FF)
+
+    def set_register_6xnn(self, reg, value):
+        self.v[reg] = value
         self.program_counter.next()
 
 
@@ -17,8 +20,10 @@ class OpcodeSet7xxx(OpcodeSet):
     """
     7XNN: Adds NN to VX
     """
-    def execute(self, opcode):
+    def decode(self, opcode):
         (_, reg, _, _) = get_opcode_digits(opcode)
-        value = opcode & 0x00FF
-        self.registers.v[reg] = (self.registers.v[reg] + value) % 256
+        return partial(self.add_to_register_7xnn, reg, opcode & 0x00FF)
+
+    def add_to_register_7xnn(self, reg, value):
+        self.v[reg] = (self.v[reg] + value) % 256
         self.program_counter.next()
@@ -1,3 +1,4 @@
+from functools import partial
 from opcodes.opcode_set import OpcodeSet
 from util import get_opcode_digits
 
@@ -6,10 +7,12 @@ class OpcodeSet9xxx(OpcodeSet):
     """
     9XY0: Skips next instruction if VX != VY
     """
-    def execute(self, opcode):
+    def decode(self, opcode):
         (_, x_reg, y_reg, _) = get_opcode_digits(opcode)
+        return partial(self.skip_if_registers_not_equal_9xy0, x_reg, y_reg)
 
-        if self.registers.v[x_reg] != self.registers.v[y_reg]:
+    def skip_if_registers_not_equal_9xy0(self, x_reg, y_reg):
+        if self.v[x_reg] != self.v[y_reg]:
             self.program_counter.skip()
         else:
             self.program_counter.next()
@@ -19,8 +22,11 @@ class OpcodeSetAxxx(OpcodeSet):
     """
     ANNN: Sets the index register to NNN
     """
-    def execute(self, opcode):
-        self.registers.i = opcode & 0x0FFF
+    def decode(self, opcode):
+        return partial(self.set_address_register_annn, opcode & 0x0FFF)
+
+    def set_address_register_annn(self, address):
+        self.registers.i = address
         self.program_counter.next()
 
 
@@ -28,6 +34,8 @@ class OpcodeSetBxxx(OpcodeSet):
     """
     BNNN: Jumps to the address NNN + V0
     """
-    def execute(self, opcode):
-        offset = opcode & 0x0FFF
-        self.program_counter.value = self.registers.v[0] + offset
+    def decode(self, opcode):
+        return partial(self.jump_with_offset_bnnn, opcode & 0x0FFF)
+
+    def jump_with_offset_bnnn(self, offset):
+        self.program_counter.value = self.v[0] + offset
@@ -1,4 +1,4 @@
-import random
+from functools import partial
 from opcodes.opcode_set import OpcodeSet
 from util import get_opcode_digits
 
@@ -7,11 +7,12 @@ class OpcodeSetCxxx(OpcodeSet):
     """
     CXNN: Sets VX to the bitwise and NNN and a random number
     """
-    def execute(self, opcode):
+    def decode(self, opcode):
         (_, reg, _, _) = get_opcode_digits(opcode)
-        val = opcode & 0x00FF
+        return partial(self.random_and_cxnn, reg, opcode & 0x00FF)
 
-        self.registers.v[reg] = val & random.randint(0, 255)
+    def random_and_cxnn(self, reg, val):
+        self.v[reg] = val & self.random.randint(0, 255)
         self.program_counter.next()
 
 
@@ -20,20 +21,19 @@ class OpcodeSetDxxx(OpcodeSet):
     DXYN: Draws sprites on the screen
 
     Draws a sprite of size 8xN at the coordinates read from the
-    VX and VY registers
+    VX and VY registers, clipped or wrapped at the screen edges
+    depending on Quirks.clip_sprites
     """
-    def execute(self, opcode):
-        (_, x_coord, y_coord, height) = get_opcode_digits(opcode)
-
-        self.registers.v[15] = 0
-
-        for line_num in range(height):
-            sprite_line = self.memory.get_byte(self.registers.i + line_num)
-            collision = self.graphics.set_sprite_line(x_coord,
-                                                      y_coord + line_num,
-                                                      sprite_line)
-            if collision:
-                self.registers.v[15] = 1
+    def decode(self, opcode):
+        (_, x_reg, y_reg, height) = get_opcode_digits(opcode)
+        return partial(self.draw_sprite_dxyn, x_reg, y_reg, height)
+
+    def draw_sprite_dxyn(self, x_reg, y_reg, height):
+        sprite = self.memory.get(self.registers.i, height)
+        collision = self.graphics.draw_sprite(self.v[x_reg], self.v[y_reg],
+                                              sprite,
+                                              not self.quirks.clip_sprites)
+        self.v[15] = 1 if collision else 0
         self.program_counter.next()
 
 
@@ -42,15 +42,19 @@ class OpcodeSetExxx(OpcodeSet):
     EX9E: Skips next instruction if the key stored in VX is pressed
     EXA1: Skips next instruction if the key stored in VX is not pressed
     """
-    def execute(self, opcode):
+    def decode(self, opcode):
         (_, reg, _, opcode_end) = get_opcode_digits(opcode)
-        key_num = self.registers.v[reg]
-        is_pressed = self.keypad.is_pressed(key_num)
-
         if (opcode_end == 0xE):
-            self.conditional_skip(is_pressed)
-        else:
-            self.conditional_skip(not is_pressed)
+            return partial(self.skip_if_pressed_ex9e, reg)
+        return partial(self.skip_if_not_pressed_exa1, reg)
+
+    def skip_if_pressed_ex9e(self, reg):
+        key_num = self.v[reg]
+        self.conditional_skip(self.keypad.is_pressed(key_num))
+
+    def skip_if_not_pressed_exa1(self, reg):
+        key_num = self.v[reg]
+        self.conditional_skip(not self.keypad.is_pressed(key_num))
 
     def conditional_skip(self, should_skip):
         if should_skip:
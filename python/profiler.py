@@ -0,0 +1,109 @@
+import json
+import time
+from collections import Counter
+from functools import partial
+
+
+def handler_name(handler):
+    """
+    Returns the qualified name of the OpcodeSet method behind a handler
+    """
+    while isinstance(handler, partial):
+        if handler.args and callable(handler.args[0]):
+            handler = handler.args[0]
+        else:
+            handler = handler.func
+    return handler.__qualname__
+
+
+class Profiler:
+    """
+    Per-opcode instrumentation for a Chip8
+
+    attach() replaces the machine's emulate_cycle with an instrumented
+    wrapper and detach() puts back whatever was there before, so a
+    machine that is not being profiled runs the normal method with no
+    extra checks.
+    """
+    def __init__(self):
+        self.cycles = 0
+        self.family_counts = Counter()
+        self.handler_counts = Counter()
+        self.handler_times = Counter()
+        self.pc_counts = Counter()
+        self.__names = {}
+        self.__saved_emulate_cycle = None
+
+    def attach(self, chip8):
+        """
+        Wraps the machine's current emulate_cycle, which may itself be
+        another tool's wrapper
+        """
+        self.__saved_emulate_cycle = vars(chip8).get('emulate_cycle')
+        run_instruction = chip8.emulate_cycle
+        program_counter = chip8.program_counter
+        decode = chip8.decode
+        names = self.__names
+        perf_counter_ns = time.perf_counter_ns
+
+        def emulate_cycle():
+            data = chip8.memory.data
+            pc = program_counter.value
+            opcode = (data[pc] << 8) | data[pc + 1]
+            handler = decode(opcode)
+
+            start = perf_counter_ns()
+            run_instruction()
+            elapsed = perf_counter_ns() - start
+
+            name = names.get(handler)
+            if name is None:
+                name = names[handler] = handler_name(handler)
+            self.cycles += 1
+            self.family_counts[opcode >> 12] += 1
+            self.handler_counts[name] += 1
+            self.handler_times[name] += elapsed
+            self.pc_counts[pc] += 1
+
+        chip8.emulate_cycle = emulate_cycle
+
+    def detach(self, chip8):
+        if self.__saved_emulate_cycle is None:
+            del chip8.emulate_cycle
+        else:
+            chip8.emulate_cycle = self.__saved_emulate_cycle
+
+    def hot_pcs(self, count=20):
+        return self.pc_counts.most_common(count)
+
+    def to_dict(self):
+        return {
+            'cycles': self.cycles,
+            'families': {
+                f'{family:X}xxx': count
+                for family, count in sorted(self.family_counts.items())
+            },
+            'handlers': {
+                name: {
+                    'count': self.handler_counts[name],
+                    'total_ns': self.handler_times[name],
+                }
+                for name in sorted(self.handler_counts)
+            },
+            'hot_pcs': [[f'0x{pc:03X}', count]
+                        for pc, count in self.hot_pcs()],
+        }
+
+    def write_json(self, path):
+        with open(path, 'w') as output:
+            json.dump(self.to_dict(), output, indent=2)
+
+    def write_collapsed(self, path):
+        """
+        Writes time per handler in the collapsed stack format read by
+        flamegraph.pl and speedscope, weighted in nanoseconds
+        """
+        with open(path, 'w') as output:
+            for name, total_ns in sorted(self.handler_times.items()):
+                stack = ';'.join(['emulate_cycle'] + name.split('.'))
+                output.write(f'{stack} {total_ns}\n')
@@ -0,0 +1,151 @@
+from util import get_opcode_digits
+
+MAX_BLOCK_LENGTH = 64
+
+# Inline Python for 8XYN opcodes, keyed by N
+ARITHMETIC_8XYN = {
+    0x0: ['v[{x}] = v[{y}]'],
+    0x1: ['v[{x}] = v[{x}] | v[{y}]'],
+    0x2: ['v[{x}] = v[{x}] & v[{y}]'],
+    0x3: ['v[{x}] = v[{x}] ^ v[{y}]'],
+    0x4: ['t = v[{x}] + v[{y}]', 'v[{x}] = t & 0xFF',
+          'v[15] = 1 if t > 0xFF else 0'],
+    0x5: ['t = v[{x}] - v[{y}]', 'v[{x}] = t & 0xFF',
+          'v[15] = 1 if t < 0 else 0'],
+    0x6: ['t = v[{x}]', 'v[{x}] = t >> 1', 'v[15] = t & 1'],
+    0x7: ['t = v[{y}] - v[{x}]', 'v[{x}] = t & 0xFF',
+          'v[15] = 1 if t < 0 else 0'],
+    0xE: ['t = v[{x}]', 'v[{x}] = (t << 1) & 0xFF', 'v[15] = t >> 7'],
+}
+
+# Fxxx opcodes that never branch or write memory, run through the
+# interpreter's handler from inside a block
+STRAIGHT_LINE_FXNN = {0x07, 0x15, 0x18, 0x1E, 0x29, 0x65}
+
+
+class Block:
+    def __init__(self, start, end, run):
+        self.start = start
+        self.end = end
+        self.length = (end - start) // 2
+        self.run = run
+
+
+class Recompiler:
+    """
+    Translates straight-line runs of opcodes into generated Python
+    functions, cached by start address
+
+    A block stops before the first opcode that can branch, skip, write
+    memory or fail to decode; that opcode is left to
+    Chip8.emulate_cycle. Writes to memory covered by a block drop it
+    from the cache, so self-modifying code is translated again.
+    """
+    def __init__(self, chip8):
+        self.chip8 = chip8
+        self.blocks = {}
+        self.code_map = bytearray(len(chip8.memory.data))
+        chip8.memory.write_listeners.append(self.invalidate)
+
+    def run(self, cycles):
+        """
+        Executes exactly cycles instructions, translated where possible
+        """
+        chip8 = self.chip8
+        program_counter = chip8.program_counter
+        blocks = self.blocks
+        remaining = cycles
+        while remaining > 0:
+            pc = program_counter.value
+            block = blocks.get(pc)
+            if block is None:
+                block = self.translate(pc)
+            if 0 < block.length <= remaining:
+                block.run()
+                remaining -= block.length
+            else:
+                chip8.emulate_cycle()
+                remaining -= 1
+        return cycles
+
+    def precompile(self, addresses):
+        """
+        Translates blocks ahead of time, for example at the block starts
+        found by analyzer.analyze
+        """
+        for address in addresses:
+            if address not in self.blocks:
+                self.translate(address)
+
+    def translate(self, start):
+        data = self.chip8.memory.data
+        lines = []
+        handlers = []
+        loc = start
+        while loc + 1 < len(data) and (loc - start) // 2 < MAX_BLOCK_LENGTH:
+            opcode = (data[loc] << 8) | data[loc + 1]
+            statements = self.__translate_opcode(opcode, loc, handlers)
+            if statements is None:
+                break
+            lines.extend(statements)
+            loc += 2
+
+        block = Block(start, loc, self.__compile(lines, handlers, loc))
+        self.blocks[start] = block
+        self.code_map[start:loc] = b'\x01' * (loc - start)
+        return block
+
+    def invalidate(self, loc, length):
+        if not any(self.code_map[loc:loc + length]):
+            return
+
+        end = loc + length
+        stale = [b for b in self.blocks.values()
+                 if b.start < end and loc < b.end]
+        for block in stale:
+            del self.blocks[block.start]
+            self.code_map[block.start:block.end] = bytes(block.end -
+                                                         block.start)
+
+        # Blocks overlapping the removed ones must keep their marks
+        for block in self.blocks.values():
+            self.code_map[block.start:block.end] = b'\x01' * (block.end -
+                                                              block.start)
+
+    def __translate_opcode(self, opcode, loc, handlers):
+        (first, x, y, n) = get_opcode_digits(opcode)
+        nn = opcode & 0x00FF
+        if first == 0x6:
+            return [f'v[{x}] = {nn}']
+        if first == 0x7:
+            return [f'v[{x}] = (v[{x}] + {nn}) & 0xFF']
+        if first == 0x8 and n in ARITHMETIC_8XYN:
+            return [s.format(x=x, y=y) for s in ARITHMETIC_8XYN[n]]
+        if first == 0xA:
+            return [f'registers.i = {opcode & 0x0FFF}']
+        if first == 0xC:
+            return [f'v[{x}] = {nn} & randint(0, 255)']
+        if ((first == 0x0 and n == 0) or first == 0xD
+                or (first == 0xF and nn in STRAIGHT_LINE_FXNN)):
+            handlers.append(self.chip8.decode(opcode))
+            return [
+                f'program_counter.value = {loc}',
+                f'handlers[{len(handlers) - 1}]()',
+            ]
+        return None
+
+    def __compile(self, lines, handlers, end):
+        body = '\n'.join('        ' + line for line in lines)
+        source = ('def make_block(registers, program_counter, handlers,'
+                  ' randint):\n'
+                  '    def block():\n'
+                  '        v = registers.v\n'
+                  f'{body}\n'
+                  f'        program_counter.value = {end}\n'
+                  '    return block\n')
+        namespace = {}
+        exec(compile(source, '<chip8 block>', 'exec'), namespace)
+        return namespace['make_block'](self.chip8.registers,
+                                       self.chip8.program_counter,
+                                       tuple(handlers),
+                                       self.chip8.random.randint)
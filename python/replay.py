@@ -0,0 +1,113 @@
+"""
+Deterministic session recording and replay
+
+A recording is a header holding a Chip8 snapshot (which includes the
+machine's random number generator state) followed by an append-only
+log of input events, each tagged with the number of instructions
+executed before it happened:
+
+    b'C8RP', version, snapshot length, snapshot
+    (cycle: uint32, event: uint8) ...
+
+Events are timer ticks, key presses and key releases. The last event
+marks the end of the session. Replaying restores the snapshot and
+reapplies the events at the same cycles, with no throttling.
+
+Cycles are counted through Chip8.emulate_cycle, so record with the
+interpreter rather than the Recompiler.
+"""
+import struct
+from chip8 import Chip8
+
+MAGIC = b'C8RP'
+VERSION = 1
+HEADER = struct.Struct('>4sBI')
+EVENT = struct.Struct('>IB')
+
+TICK = 0x00
+KEY_PRESS = 0x10
+KEY_RELEASE = 0x20
+END = 0xFF
+
+
+class Recorder:
+    def __init__(self, chip8, output):
+        self.chip8 = chip8
+        self.output = output
+        self.cycles = 0
+
+        snapshot = chip8.snapshot()
+        output.write(HEADER.pack(MAGIC, VERSION, len(snapshot)))
+        output.write(snapshot)
+
+        self.__saved_emulate_cycle = vars(chip8).get('emulate_cycle')
+        emulate_cycle = chip8.emulate_cycle
+
+        def counted_emulate_cycle():
+            emulate_cycle()
+            self.cycles += 1
+
+        chip8.emulate_cycle = counted_emulate_cycle
+        chip8.keys.listeners.append(self.on_key)
+        chip8.timers.listeners.append(self.on_tick)
+
+    def on_key(self, key_num, pressed):
+        event = (KEY_PRESS if pressed else KEY_RELEASE) | key_num
+        self.output.write(EVENT.pack(self.cycles, event))
+
+    def on_tick(self):
+        self.output.write(EVENT.pack(self.cycles, TICK))
+
+    def close(self):
+        """
+        Ends the recording and detaches from the machine
+        """
+        self.output.write(EVENT.pack(self.cycles, END))
+        self.output.flush()
+        if self.__saved_emulate_cycle is None:
+            del self.chip8.emulate_cycle
+        else:
+            self.chip8.emulate_cycle = self.__saved_emulate_cycle
+        self.chip8.keys.listeners.remove(self.on_key)
+        self.chip8.timers.listeners.remove(self.on_tick)
+
+
+def read_recording(recording):
+    """
+    Returns the snapshot and the list of (cycle, event) from a recording
+    """
+    view = memoryview(recording)
+    (magic, version, snapshot_size) = HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Unsupported recording format')
+    offset = HEADER.size
+    snapshot = view[offset:offset + snapshot_size]
+    events = list(EVENT.iter_unpack(view[offset + snapshot_size:]))
+    return (snapshot, events)
+
+
+def replay(recording, chip8=None):
+    """
+    Re-runs a recorded session as fast as possible and returns the
+    machine in its final state
+    """
+    (snapshot, events) = read_recording(recording)
+    chip8 = chip8 or Chip8()
+    chip8.restore(snapshot)
+
+    emulate_cycle = chip8.emulate_cycle
+    cycles = 0
+    for (event_cycle, event) in events:
+        for _ in range(event_cycle - cycles):
+            emulate_cycle()
+        cycles = event_cycle
+
+        if event == END:
+            break
+        if event == TICK:
+            chip8.timers.tick()
+        elif event & 0xF0 == KEY_PRESS:
+            chip8.keys.press_key(event & 0x0F)
+        elif event & 0xF0 == KEY_RELEASE:
+            chip8.keys.release_key(event & 0x0F)
+    return chip8
@@ -0,0 +1,123 @@
+"""
+Shared, read-only ROM images
+
+A RomCache maps each ROM file once, hashes its contents and keeps one
+immutable memory image (font set plus program) per distinct hash.
+Every Memory created from the cache reads that image directly and
+only takes a private copy on its first write.
+
+To share images with worker processes, the parent calls share(),
+which places the image in multiprocessing shared memory. Each worker
+then calls attach() with the returned name and gets a zero-copy view.
+"""
+import hashlib
+import mmap
+import os
+from multiprocessing import resource_tracker, shared_memory
+from memory import MEMORY_SIZE, Memory, build_image
+
+
+class RomCache:
+    def __init__(self):
+        # Content hash -> memory image
+        self.images = {}
+
+        # (path, size, mtime) -> content hash, to skip rehashing
+        self.digests = {}
+
+        # Content hash -> shared memory block this cache created
+        self.created_blocks = {}
+
+        # Block name -> (shared memory block, read-only image) attached
+        # from another process
+        self.attached_blocks = {}
+
+    def digest(self, path):
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if key not in self.digests:
+            self.image(path)
+        return self.digests[key]
+
+    def image(self, path):
+        """
+        Returns the memory image for the ROM at path
+        """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        digest = self.digests.get(key)
+        if digest is not None:
+            return self.images[digest]
+
+        with open(path, 'rb') as rom_file:
+            if stat.st_size == 0:
+                rom_data = b''
+                digest = hashlib.sha256(rom_data).hexdigest()
+                image = self.images.get(digest) or build_image(rom_data)
+            else:
+                with mmap.mmap(rom_file.fileno(), 0,
+                               access=mmap.ACCESS_READ) as rom_data:
+                    digest = hashlib.sha256(rom_data).hexdigest()
+                    image = self.images.get(digest) or build_image(rom_data)
+
+        self.digests[key] = digest
+        self.images.setdefault(digest, image)
+        return self.images[digest]
+
+    def memory(self, path):
+        return Memory.from_image(self.image(path))
+
+    def share(self, path):
+        """
+        Copies the ROM's image into shared memory once and returns the
+        block name for workers to attach()
+        """
+        digest = self.digest(path)
+        block = self.created_blocks.get(digest)
+        if block is None:
+            image = self.images[digest]
+            block = shared_memory.SharedMemory(create=True,
+                                               size=len(image))
+            block.buf[:len(image)] = image
+            self.created_blocks[digest] = block
+        return block.name
+
+    def attach(self, name):
+        """
+        Returns a Memory reading from the shared block called name
+
+        A block this cache created is not opened again; the Memory reads
+        the image it was copied from.
+        """
+        for (digest, block) in self.created_blocks.items():
+            if block.name == name:
+                return Memory.from_image(self.images[digest])
+
+        attached = self.attached_blocks.get(name)
+        if attached is None:
+            block = shared_memory.SharedMemory(name=name)
+            # The creating process owns the block; stop this process's
+            # resource tracker from unlinking it at exit
+            tracked_name = block._name  # pylint: disable=protected-access
+            resource_tracker.unregister(tracked_name, 'shared_memory')
+            attached = (block, block.buf[:MEMORY_SIZE].toreadonly())
+            self.attached_blocks[name] = attached
+        return Memory.from_image(attached[1])
+
+    def close(self, unlink=True):
+        """
+        Releases shared blocks, unlinking the ones this cache created
+
+        Every Memory reading from a shared block must have been written
+        to or discarded first.
+        """
+        for (block, image) in self.attached_blocks.values():
+            image.release()
+            block.close()
+        self.attached_blocks = {}
+
+        for block in self.created_blocks.values():
+            block.close()
+            if unlink:
+                block.unlink()
+        self.created_blocks = {}
@@ -0,0 +1,111 @@
+import time
+from idle import IdleSkipper
+
+TIMER_HZ = 60
+
+# How far behind its deadline a throttled scheduler may fall before it
+# gives up catching up and starts pacing from the current time
+MAX_LAG = 0.25
+
+
+class Scheduler:
+    """
+    Runs a Chip8 in 60hz frames
+
+    Each frame executes cpu_hz / 60 instructions, ticks the timers once
+    and calls render with the Graphics if the framebuffer changed.
+    When throttled, frames are paced against absolute deadlines with
+    time.sleep so they do not drift; unthrottled runs as fast as
+    possible for benchmarks and batch jobs.
+
+    Given a timing.TimingModel, frames instead run until the opcodes'
+    cycle costs use up clock_hz / 60 machine cycles, and cpu_hz is
+    ignored. Overshoot is carried into the next frame.
+
+    With skip_idle, untimed frames run through an idle.IdleSkipper, so
+    a ROM waiting on a key or the delay timer costs a few instructions
+    per frame instead of cpu_hz / 60.
+    """
+    def __init__(self, chip8, cpu_hz=700, render=None, throttled=True,
+                 timing=None, skip_idle=False):
+        self.chip8 = chip8
+        self.cpu_hz = cpu_hz
+        self.timing = timing
+        self.idle = IdleSkipper(chip8) if skip_idle else None
+        self.render = render
+        self.throttled = throttled
+        self.frames = 0
+        self.cycles = 0
+        self.__cycle_budget = 0.0
+
+    def run_frame(self):
+        if self.timing is None:
+            self.__cycle_budget += self.cpu_hz / TIMER_HZ
+            cycles = int(self.__cycle_budget)
+            self.__cycle_budget -= cycles
+
+            if self.idle is not None:
+                self.idle.run(cycles)
+            else:
+                emulate_cycle = self.chip8.emulate_cycle
+                for _ in range(cycles):
+                    emulate_cycle()
+            self.cycles += cycles
+        else:
+            self.__run_timed_cycles()
+        self.chip8.timers.tick()
+
+        graphics = self.chip8.graphics
+        if self.render is not None and graphics.should_draw:
+            self.render(graphics)
+            graphics.should_draw = False
+        self.frames += 1
+
+    def __run_timed_cycles(self):
+        timing = self.timing
+        chip8 = self.chip8
+        memory = chip8.memory
+        program_counter = chip8.program_counter
+        emulate_cycle = chip8.emulate_cycle
+        cost = timing.cost
+
+        frame_cycles = timing.cycles_per_frame
+        budget = self.__cycle_budget + frame_cycles
+        instructions = 0
+        while budget > 0:
+            pc = program_counter.value
+            data = memory.data
+            (cycles, waits_for_vblank) = cost((data[pc] << 8) | data[pc + 1])
+            emulate_cycle()
+            instructions += 1
+            if waits_for_vblank:
+                # The rest of the frame is spent idle; the draw itself
+                # is paid for after the interrupt
+                budget = 0
+            budget -= cycles
+
+        timing.cycles += frame_cycles - budget + self.__cycle_budget
+        self.__cycle_budget = budget
+        self.cycles += instructions
+
+    def run(self, frames=None, should_continue=None):
+        """
+        Runs frames frames, or until should_continue returns False
+        """
+        frame_time = 1 / TIMER_HZ
+        deadline = time.perf_counter()
+        remaining = frames
+        while remaining is None or remaining > 0:
+            if should_continue is not None and not should_continue():
+                break
+            self.run_frame()
+            if remaining is not None:
+                remaining -= 1
+
+            if self.throttled:
+                deadline += frame_time
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -MAX_LAG:
+                    deadline = time.perf_counter()
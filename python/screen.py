@@ -1,20 +1,40 @@
-import itertools
+import ctypes
+import sdl2
 import sdl2.ext
+from graphics import WIDTH, HEIGHT
 
-WHITE = sdl2.ext.Color(255, 255, 255)
-BLACK = sdl2.ext.Color(0, 0, 0)
+WHITE = 0xFFFFFFFF
+BLACK = 0xFF000000
+PIXEL_SIZE = 4
+
+# ARGB8888 pixels for each possible byte of a packed framebuffer row
+BYTE_PIXELS = [
+    b''.join((WHITE if byte & (0x80 >> bit) else BLACK).to_bytes(
+        PIXEL_SIZE, 'little') for bit in range(8)) for byte in range(256)
+]
 
 
 class Screen:
+    """
+    SDL window showing a Graphics framebuffer
+
+    The framebuffer lives in a single streaming texture, and each draw
+    only uploads the band of rows that changed since the last one.
+    """
     def __init__(self, scaling):
         self.scaling = scaling
 
-        window_width = 64 * scaling
-        window_height = 32 * scaling
+        window_width = WIDTH * scaling
+        window_height = HEIGHT * scaling
         self.window = sdl2.ext.Window('Chip-8',
                                       size=(window_width, window_height))
 
-        self.renderer = sdl2.ext.Renderer(self.window, logical_size=(64, 32))
+        self.renderer = sdl2.ext.Renderer(self.window,
+                                          logical_size=(WIDTH, HEIGHT))
+        self.texture = sdl2.SDL_CreateTexture(
+            self.renderer.sdlrenderer, sdl2.SDL_PIXELFORMAT_ARGB8888,
+            sdl2.SDL_TEXTUREACCESS_STREAMING, WIDTH, HEIGHT)
+        self.needs_full_upload = True
 
     def show(self):
         self.window.show()
@@ -23,10 +43,22 @@ class Screen:
         self.renderer.clear()
         self.renderer.present()
 
-    def draw(self, pixels):
-        self.renderer.clear()
-        pixel_coords = ((px.x, px.y) for px in pixels if px.is_on)
-        points = list(itertools.chain.from_iterable(pixel_coords))
-        self.renderer.draw_point(points, color=WHITE)
+    def draw(self, graphics):
+        dirty = graphics.take_dirty_rows()
+        if self.needs_full_upload:
+            dirty = (0, HEIGHT)
+            self.needs_full_upload = False
+        if dirty is not None:
+            self.upload_rows(graphics, *dirty)
 
+        sdl2.SDL_RenderCopy(self.renderer.sdlrenderer, self.texture, None,
+                            None)
         self.renderer.present()
+
+    def upload_rows(self, graphics, first, last):
+        pixels = b''.join(BYTE_PIXELS[byte]
+                          for row in graphics.rows[first:last]
+                          for byte in row.to_bytes(WIDTH // 8, 'big'))
+        rect = sdl2.SDL_Rect(0, first, WIDTH, last - first)
+        sdl2.SDL_UpdateTexture(self.texture, ctypes.byref(rect), pixels,
+                               WIDTH * PIXEL_SIZE)
@@ -0,0 +1,62 @@
+from array import array
+
+STACK_DEPTH = 16
+
+
+class StackError(Exception):
+    pass
+
+
+class StackOverflowError(StackError):
+    pass
+
+
+class StackUnderflowError(StackError):
+    pass
+
+
+class Stack:
+    """
+    Fixed-size call stack of return addresses
+
+    Entries live in a preallocated array indexed by the stack pointer
+    sp, so push and pop never allocate.
+    """
+    __slots__ = ('entries', 'sp')
+
+    def __init__(self, depth=STACK_DEPTH):
+        self.entries = array('H', bytes(2 * depth))
+        self.sp = 0
+
+    def push(self, address):
+        sp = self.sp
+        if sp == len(self.entries):
+            raise StackOverflowError(
+                f'Call stack overflow at depth {len(self.entries)}')
+        self.entries[sp] = address
+        self.sp = sp + 1
+
+    def pop(self):
+        if self.sp == 0:
+            raise StackUnderflowError('Return with an empty call stack')
+        self.sp -= 1
+        return self.entries[self.sp]
+
+    def load(self, addresses):
+        """
+        Replaces the contents of the stack, bottom first
+        """
+        if len(addresses) > len(self.entries):
+            raise StackOverflowError(
+                f'Call stack overflow at depth {len(self.entries)}')
+        self.entries[:len(addresses)] = array('H', addresses)
+        self.sp = len(addresses)
+
+    def depth(self):
+        return len(self.entries)
+
+    def __len__(self):
+        return self.sp
+
+    def __iter__(self):
+        return iter(self.entries[:self.sp])
@@ -0,0 +1,87 @@
+# pylint: disable=no-self-use,too-few-public-methods
+
+from io import BytesIO
+from analyzer import analyze, main, CLASSIFIER
+from chip8 import Chip8
+from recompiler import Recompiler
+
+PROGRAM = bytes([
+    0x60, 0x05,  # 0x200: V0 = 5
+    0x22, 0x0C,  # 0x202: call 0x20C
+    0x30, 0x00,  # 0x204: skip if V0 == 0
+    0x12, 0x0A,  # 0x206: jump 0x20A
+    0xF1, 0x0A,  # 0x208: wait for key into V1
+    0x12, 0x0A,  # 0x20A: jump 0x20A
+    0xA2, 0x12,  # 0x20C: I = 0x212
+    0xD0, 0x15,  # 0x20E: draw
+    0x00, 0xEE,  # 0x210: return
+    0xFF, 0x80, 0x81, 0x08,  # 0x212: sprite data
+])
+
+
+class TestClassifier:
+    def test_supported_opcodes(self):
+        assert CLASSIFIER.pattern(0x00E0) == '00E0'
+        assert CLASSIFIER.pattern(0x8124) == '8XY4'
+        assert CLASSIFIER.pattern(0x812E) == '8XYE'
+        assert CLASSIFIER.pattern(0xF355) == 'FX55'
+
+    def test_unsupported_opcodes(self):
+        for opcode in (0x0000, 0x0123, 0x5121, 0x8128, 0xE1A2, 0xF175):
+            assert CLASSIFIER.pattern(opcode) is None
+
+
+class TestAnalyzer:
+    def test_reachable_code_and_data(self):
+        analysis = analyze(PROGRAM)
+        assert sorted(analysis.instructions) == list(range(0x200, 0x212, 2))
+        assert analysis.data_regions == [(0x212, 0x216)]
+        assert analysis.unsupported == []
+
+    def test_control_flow_graph(self):
+        blocks = analyze(PROGRAM).blocks
+        assert sorted(blocks) == [0x200, 0x206, 0x208, 0x20A, 0x20C]
+        assert blocks[0x200].end == 0x206
+        assert blocks[0x200].successors == [0x206, 0x208]
+        assert blocks[0x200].calls == [0x20C]
+        assert blocks[0x20A].successors == [0x20A]
+        assert blocks[0x20C].successors == []
+
+    def test_histogram(self):
+        histogram = analyze(PROGRAM).histogram
+        assert histogram['1NNN'] == 2
+        assert histogram['DXYN'] == 1
+        assert sum(histogram.values()) == 9
+
+    def test_unsupported_opcodes_stop_the_walk(self):
+        analysis = analyze(bytes([0x60, 0x01, 0x81, 0x28, 0x60, 0x02]))
+        assert analysis.unsupported == [(0x202, 0x8128)]
+        assert analysis.data_regions == [(0x204, 0x206)]
+        assert analysis.histogram['unsupported'] == 1
+
+    def test_indirect_jumps(self):
+        analysis = analyze(bytes([0xB3, 0x00]))
+        assert analysis.indirect_jumps == [0x200]
+        assert analysis.blocks[0x200].successors == []
+
+    def test_disassemble(self):
+        listing = analyze(PROGRAM).disassemble().splitlines()
+        assert listing[0] == 'L200:'
+        assert listing[1] == '    200  6005  LD V0, 0x05'
+        assert '    20E  D015  DRW V0, V1, 5' in listing
+
+    def test_precompile_blocks(self):
+        chip = Chip8()
+        chip.load_game(BytesIO(PROGRAM))
+        recompiler = Recompiler(chip)
+        recompiler.precompile(analyze(PROGRAM).blocks)
+        assert 0x20C in recompiler.blocks
+        recompiler.run(6)
+        assert chip.registers.i == 0x212
+
+    def test_main_summary(self, tmp_path, capsys):
+        (tmp_path / 'game.ch8').write_bytes(PROGRAM)
+        assert main([str(tmp_path)]) == 0
+        output = capsys.readouterr().out
+        assert '"instructions": 9' in output
+        assert '"data_bytes": 4' in output
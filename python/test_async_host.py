@@ -0,0 +1,111 @@
+# pylint: disable=no-self-use,too-few-public-methods
+
+import asyncio
+from io import BytesIO
+from async_host import AsyncMachine, serve
+from chip8 import Chip8
+from frame_delta import FRAME_HEADER, FrameDecoder
+
+# Waits for a key, draws its character, then spins
+PROGRAM = b'\xF0\x0A\xF0\x29\xD1\x15\x12\x06'
+
+
+def make_machine(**kwargs):
+    chip = Chip8()
+    chip.load_game(BytesIO(PROGRAM))
+    return AsyncMachine(chip, **kwargs)
+
+
+async def read_frame(reader):
+    """
+    Reads exactly one delta-encoded frame, following its row and byte
+    masks, however the stream happens to be split into packets
+    """
+    frame = await reader.readexactly(FRAME_HEADER.size)
+    (_, row_mask) = FRAME_HEADER.unpack(frame)
+    for _ in range(bin(row_mask).count('1')):
+        byte_mask = await reader.readexactly(1)
+        frame += byte_mask
+        frame += await reader.readexactly(bin(byte_mask[0]).count('1'))
+    return frame
+
+
+class TestAsyncMachine:
+    def test_key_events_and_frames(self):
+        async def scenario():
+            machine = make_machine(throttled=False)
+            frames = []
+
+            async def collect():
+                async for frame in machine.frames():
+                    frames.append(frame)
+
+            collector = asyncio.ensure_future(collect())
+            await asyncio.sleep(0)
+            machine.press_key(0xA)
+            await machine.run(frames=5)
+            await collector
+            return (machine, frames)
+
+        (machine, frames) = asyncio.run(scenario())
+
+        assert machine.chip8.registers.v[0] == 0xA
+        assert len(frames) >= 1
+        assert len(frames[-1]) == 256
+        assert any(frames[-1])
+
+    def test_many_machines_on_one_loop(self):
+        async def scenario():
+            machines = [make_machine() for _ in range(20)]
+            await asyncio.gather(*(m.run(frames=3) for m in machines))
+            return machines
+
+        machines = asyncio.run(scenario())
+
+        assert all(m.scheduler.frames == 3 for m in machines)
+
+    def test_tcp_stream(self):
+        async def scenario():
+            machine = make_machine()
+            server = await serve(machine)
+            port = server.sockets[0].getsockname()[1]
+            runner = asyncio.ensure_future(machine.run())
+
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            await asyncio.sleep(0.05)
+            writer.write(b'\x17')
+            frame = await asyncio.wait_for(reader.readexactly(256), 2)
+
+            writer.close()
+            runner.cancel()
+            server.close()
+            await server.wait_closed()
+            return (machine, frame)
+
+        (machine, frame) = asyncio.run(scenario())
+
+        assert machine.chip8.registers.v[0] == 7
+        assert any(frame)
+
+    def test_tcp_delta_stream(self):
+        async def scenario():
+            machine = make_machine()
+            server = await serve(machine, delta=True)
+            port = server.sockets[0].getsockname()[1]
+            runner = asyncio.ensure_future(machine.run())
+
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            await asyncio.sleep(0.05)
+            writer.write(b'\x17')
+            encoded = await asyncio.wait_for(read_frame(reader), 2)
+
+            writer.close()
+            runner.cancel()
+            server.close()
+            await server.wait_closed()
+            return (machine, encoded)
+
+        (machine, encoded) = asyncio.run(scenario())
+        (rows, _) = FrameDecoder().decode(encoded)
+
+        assert rows == machine.chip8.graphics.rows
@@ -0,0 +1,61 @@
+# pylint: disable=no-self-use,too-few-public-methods
+
+import json
+import sys
+from batch import main, run_batch, run_rom
+
+
+def write_roms(rom_dir):
+    (rom_dir / 'loop.ch8').write_bytes(b'\x70\x01\x12\x00')
+    (rom_dir / 'bad.ch8').write_bytes(b'\xF0\xFF')
+    (rom_dir / 'huge.ch8').write_bytes(bytes(4000))
+
+    # Sets the sound timer to 1, then loops
+    (rom_dir / 'sound.ch8').write_bytes(b'\x60\x01\xF0\x18\x12\x04')
+
+
+class TestBatch:
+    def test_run_batch(self, tmp_path):
+        write_roms(tmp_path)
+        summaries = {s.rom: s for s in run_batch(str(tmp_path), 100, jobs=2)}
+
+        assert summaries['loop.ch8'].cycles == 100
+        assert summaries['loop.ch8'].pc == 0x200
+        assert summaries['loop.ch8'].error is None
+        assert summaries['bad.ch8'].cycles == 0
+        assert summaries['bad.ch8'].error.startswith('KeyError')
+        assert summaries['huge.ch8'].cycles == 0
+        assert summaries['huge.ch8'].error.startswith('ValueError')
+
+    def test_timers_tick_at_60hz(self, tmp_path):
+        # Waits for a delay of 100 ticks, about 1167 cycles at 700hz,
+        # then halts at 0x20A
+        (tmp_path / 'delay.ch8').write_bytes(bytes([
+            0x60, 0x64, 0xF0, 0x15, 0xF1, 0x07, 0x31, 0x00, 0x12, 0x04,
+            0x12, 0x0A,
+        ]))
+        assert run_rom(str(tmp_path / 'delay.ch8'), 1150).pc != 0x20A
+        assert run_rom(str(tmp_path / 'delay.ch8'), 1190).pc == 0x20A
+
+    def test_cli_writes_json_lines(self, tmp_path):
+        rom_dir = tmp_path / 'roms'
+        rom_dir.mkdir()
+        write_roms(rom_dir)
+        output = tmp_path / 'summary.jsonl'
+
+        status = main([str(rom_dir), '--cycles', '10', '--jobs', '1',
+                       '--output', str(output)])
+        lines = [json.loads(line) for line in output.read_text().splitlines()]
+
+        assert status == 1
+        assert [line['rom'] for line in lines] == ['bad.ch8', 'huge.ch8',
+                                                   'loop.ch8', 'sound.ch8']
+
+    def test_stdout_holds_only_json_lines(self, tmp_path, capsys):
+        write_roms(tmp_path)
+        main([str(tmp_path), '--cycles', '100', '--jobs', '1'])
+        lines = capsys.readouterr().out.splitlines()
+
+        assert len(lines) == 4
+        assert all(json.loads(line) for line in lines)
+        assert 'sdl2' not in sys.modules
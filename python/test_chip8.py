@@ -1,8 +1,9 @@
 # pylint: disable=no-self-use,too-few-public-methods
 
-import random
+import pytest
 from io import BytesIO
-from chip8 import Chip8
+from chip8 import Chip8, Quirks
+from stack import StackOverflowError, StackUnderflowError
 
 
 class TestOpcode0XXX:
@@ -20,13 +21,21 @@ class TestOpcode0XXX:
     def test_return(self):
         chip = Chip8()
         stack_pc = 100
-        chip.stack.append(stack_pc)
+        chip.stack.push(stack_pc)
         program = BytesIO(b'\x00\xEE')
         chip.load_game(program)
         chip.emulate_cycle()
 
         assert chip.program_counter.value == stack_pc + 2
 
+    def test_return_with_empty_stack(self):
+        chip = Chip8()
+        program = BytesIO(b'\x00\xEE')
+        chip.load_game(program)
+
+        with pytest.raises(StackUnderflowError):
+            chip.emulate_cycle()
+
 
 class TestOpcode1XXX:
     def test_set_program_counter(self):
@@ -50,6 +59,17 @@ class TestOpcode2XXX:
         assert chip.program_counter.value == 0x0542
         assert chip.stack.pop() == orig_pc
 
+    def test_stack_overflow(self):
+        chip = Chip8(stack_depth=4)
+        program = BytesIO(b'\x22\x00')
+        chip.load_game(program)
+        for _ in range(4):
+            chip.emulate_cycle()
+
+        with pytest.raises(StackOverflowError):
+            chip.emulate_cycle()
+        assert len(chip.stack) == 4
+
 
 class TestOpcode3XXX:
     def test_equal_condition(self):
@@ -280,6 +300,16 @@ class TestOpcode8XXX:
         assert chip.registers.v[7] == 4
         assert chip.registers.v[0xF] == 0
 
+    def test_advances_program_counter(self):
+        chip = Chip8()
+        program = BytesIO(b'\x87\x40')
+        chip.load_game(program)
+
+        orig_pc = chip.program_counter.value
+        chip.emulate_cycle()
+
+        assert chip.program_counter.value == orig_pc + 2
+
 
 class TestOpcode9XXX:
     def test_equal_condition(self):
@@ -330,9 +360,8 @@ class TestOpcodeBXXX:
 
 class TestOpcodeCXXX:
     def test_set_random(self):
-        chip = Chip8()
+        chip = Chip8(seed=2)
         program = BytesIO(b'\xC1\x0D')
-        random.seed(2)
         chip.load_game(program)
         chip.emulate_cycle()
 
@@ -343,6 +372,8 @@ class TestOpcodeDXXX:
     def test_display_sprite(self):
         chip = Chip8()
         program = BytesIO(b'\xD2\x33\xD2\x31')
+        chip.registers.v[2] = 2
+        chip.registers.v[3] = 3
         chip.registers.i = 80
         chip.memory.set(80, b'\x3C\xC3\xFF')
         chip.load_game(program)
@@ -366,6 +397,45 @@ class TestOpcodeDXXX:
         assert gfx_line1 == [0, 0, 0, 1, 1, 0, 0, 0]
         assert chip.registers.v[15] == 1
 
+    def test_sprite_is_clipped_at_the_edges(self):
+        chip = Chip8()
+        chip.load_game(BytesIO(b'\xD0\x12'))
+        chip.registers.v[0] = 60
+        chip.registers.v[1] = 31
+        chip.registers.i = 80
+        chip.memory.set(80, b'\xFF\xFF')
+        chip.emulate_cycle()
+
+        assert chip.graphics.get_gfx_state(56, 31, 8) == [0] * 4 + [1] * 4
+        assert chip.graphics.get_gfx_state(0, 31, 8) == [0] * 8
+        assert chip.graphics.get_gfx_state(60, 0, 4) == [0] * 4
+
+    def test_sprite_wraps_with_quirk(self):
+        chip = Chip8(quirks=Quirks(clip_sprites=False))
+        chip.load_game(BytesIO(b'\xD0\x12'))
+        chip.registers.v[0] = 60
+        chip.registers.v[1] = 31
+        chip.registers.i = 80
+        chip.memory.set(80, b'\xFF\xF0')
+        chip.emulate_cycle()
+
+        assert chip.graphics.get_gfx_state(60, 31, 4) == [1] * 4
+        assert chip.graphics.get_gfx_state(0, 31, 4) == [1] * 4
+        assert chip.graphics.get_gfx_state(60, 0, 4) == [1] * 4
+        assert chip.graphics.get_gfx_state(0, 0, 4) == [0] * 4
+
+    def test_coordinates_wrap_onto_the_screen(self):
+        chip = Chip8()
+        chip.load_game(BytesIO(b'\xD0\x11'))
+        chip.registers.v[0] = 66
+        chip.registers.v[1] = 33
+        chip.registers.i = 80
+        chip.memory.set_byte(80, 0x80)
+        chip.emulate_cycle()
+
+        assert chip.graphics.pixel_at(2, 1).is_on
+        assert chip.graphics.pixel_at(66, 33).is_on
+
 
 class TestOpcodeEXXX:
     def test_jump_when_key_pressed(self):
@@ -441,7 +511,7 @@ class TestOpcodeFxxx:
         chip.load_game(program)
         chip.emulate_cycle()
 
-        assert chip.timers.delay_timer == 4
+        assert chip.timers.delay_timer == 5
         assert chip.program_counter.value == orig_pc + 2
 
     def test_set_sound_timer(self):
@@ -452,7 +522,7 @@ class TestOpcodeFxxx:
         chip.load_game(program)
         chip.emulate_cycle()
 
-        assert chip.timers.sound_timer == 4
+        assert chip.timers.sound_timer == 5
         assert chip.program_counter.value == orig_pc + 2
 
     def test_add_to_address_register(self):
@@ -476,4 +546,263 @@ class TestOpcodeFxxx:
         chip.emulate_cycle()
 
         assert chip.registers.i == 50
-        assert chip.program_counter.value == orig_pc + 2
\ No newline at end of file
+        assert chip.program_counter.value == orig_pc + 2
+
+
+class TestDecode:
+    def test_handlers_are_cached(self):
+        chip = Chip8()
+        program = BytesIO(b'\x71\x01\x12\x00')
+        chip.load_game(program)
+
+        chip.emulate_cycle()
+        chip.emulate_cycle()
+        handler = chip.decode(0x7101)
+        chip.emulate_cycle()
+
+        assert chip.registers.v[1] == 2
+        assert chip.decode(0x7101) is handler
+        assert set(chip.decoded_opcodes) == {0x7101, 0x1200}
+
+    def test_execute_matches_decode(self):
+        chip = Chip8()
+        chip.op_table[6].execute(0x6A42)
+
+        assert chip.registers.v[0xA] == 0x42
+
+
+class TestGraphics:
+    def test_sprite_line_collision(self):
+        chip = Chip8()
+        assert not chip.graphics.set_sprite_line(10, 4, 0xF0)
+        gfx_line = chip.graphics.get_gfx_state(10, 4, 8)
+        assert gfx_line == [1, 1, 1, 1, 0, 0, 0, 0]
+
+        assert chip.graphics.set_sprite_line(12, 4, 0xC0)
+        gfx_line = chip.graphics.get_gfx_state(10, 4, 8)
+        assert gfx_line == [1, 1, 0, 0, 0, 0, 0, 0]
+
+    def test_pixel_view(self):
+        chip = Chip8()
+        chip.graphics.set_sprite_line(60, 31, 0x01)
+
+        assert chip.graphics.pixel_at(60, 31).is_on is False
+        assert chip.graphics.pixel_at(63, 31).is_on is False
+        assert chip.graphics.set_sprite_line(56, 31, 0x01) is False
+        assert chip.graphics.pixel_at(63, 31).is_on
+
+        lit = [(px.x, px.y) for px in chip.graphics.pixels() if px.is_on]
+        assert lit == [(63, 31)]
+
+    def test_sprite_line_clipping(self):
+        chip = Chip8()
+        assert chip.graphics.set_sprite_line(60, 2, 0xFF) is False
+        assert chip.graphics.set_sprite_line(64, 2, 0xFF) is False
+        assert chip.graphics.set_sprite_line(200, 2, 0xFF) is False
+
+        assert chip.graphics.get_gfx_state(0, 2, 64) == [0] * 60 + [1] * 4
+        with pytest.raises(ValueError):
+            chip.graphics.set_sprite_line(-1, 2, 0xFF)
+        assert chip.graphics.get_gfx_state(0, 2, 64) == [0] * 60 + [1] * 4
+
+    def test_dirty_rows(self):
+        chip = Chip8()
+        assert chip.graphics.take_dirty_rows() is None
+
+        chip.graphics.set_sprite_line(0, 3, 0x80)
+        chip.graphics.set_sprite_line(0, 7, 0x80)
+        chip.graphics.set_sprite_line(0, 9, 0x00)
+
+        assert chip.graphics.take_dirty_rows() == (3, 8)
+        assert chip.graphics.take_dirty_rows() is None
+
+        chip.graphics.clear()
+        assert chip.graphics.take_dirty_rows() == (3, 8)
+
+
+class TestSnapshot:
+    def test_restore_round_trip(self):
+        chip = Chip8()
+        program = BytesIO(b'\x63\x07\xA0\x05\xD0\x15\x22\x00')
+        chip.load_game(program)
+        for _ in range(4):
+            chip.emulate_cycle()
+        chip.timers.delay_timer = 9
+        chip.keys.press_key(0xB)
+        blob = chip.snapshot()
+
+        restored = Chip8()
+        restored.restore(blob)
+
+        assert restored.registers.v == chip.registers.v
+        assert restored.registers.i == chip.registers.i
+        assert restored.program_counter.value == chip.program_counter.value
+        assert list(restored.stack) == list(chip.stack)
+        assert restored.timers.delay_timer == 9
+        assert restored.keys.pressed_keys() == [0xB]
+        assert restored.memory.data == chip.memory.data
+        assert restored.graphics.rows == chip.graphics.rows
+        assert restored.snapshot() == blob
+
+    def test_restore_rewinds(self):
+        chip = Chip8()
+        chip.load_game(BytesIO(b'\x70\x01\x12\x00'))
+        blob = chip.snapshot()
+        chip.emulate_cycle()
+        chip.restore(blob)
+
+        assert chip.registers.v[0] == 0
+        chip.emulate_cycle()
+        assert chip.registers.v[0] == 1
+
+    def test_random_state_survives_restore(self):
+        chip = Chip8(seed=5)
+        blob = chip.snapshot()
+        expected = [chip.random.randint(0, 255) for _ in range(5)]
+
+        restored = Chip8()
+        restored.restore(blob)
+
+        assert [restored.random.randint(0, 255) for _ in range(5)] == expected
+
+    def test_rejects_unknown_version(self):
+        chip = Chip8()
+        blob = bytearray(chip.snapshot())
+        blob[4] = 0xFF
+
+        with pytest.raises(ValueError):
+            chip.restore(blob)
+
+    def test_rejects_truncated_blob_without_changing_state(self):
+        source = Chip8()
+        source.load_game(BytesIO(b'\x12\x00'))
+        blob = source.snapshot()
+        chip = Chip8()
+        chip.graphics.take_dirty_rows()
+        memory = bytes(chip.memory.data)
+
+        for length in (len(blob) - 10, 10):
+            with pytest.raises(ValueError):
+                chip.restore(blob[:length])
+        assert bytes(chip.memory.data) == memory
+        assert chip.graphics.take_dirty_rows() is None
+
+
+class TestFork:
+    def test_child_runs_independently(self):
+        chip = Chip8()
+        chip.load_game(BytesIO(b'\x70\x01\xA0\x00\xD0\x01\x12\x00'))
+        chip.emulate_cycle()
+        child = chip.fork()
+
+        for _ in range(4):
+            child.emulate_cycle()
+
+        assert chip.registers.v[0] == 1
+        assert chip.program_counter.value == 0x202
+        assert chip.graphics.rows == [0] * 32
+        assert child.registers.v[0] == 2
+        assert child.graphics.rows != chip.graphics.rows
+
+    def test_child_draws_its_first_frame(self):
+        chip = Chip8()
+        chip.load_game(BytesIO(b'\xA0\x00\xD0\x01'))
+        chip.emulate_cycle()
+        chip.emulate_cycle()
+        chip.graphics.take_dirty_rows()
+        chip.graphics.should_draw = False
+
+        child = chip.fork()
+        assert child.graphics.rows == chip.graphics.rows
+        assert child.graphics.should_draw
+        assert child.graphics.take_dirty_rows() == (0, 32)
+
+    def test_child_copies_random_state_and_decodes_lazily(self):
+        chip = Chip8(seed=5)
+        chip.load_game(BytesIO(b'\xC0\xFF\x12\x00'))
+        child = chip.fork()
+        assert child.op_table is None
+
+        chip.emulate_cycle()
+        child.emulate_cycle()
+        assert child.registers.v[0] == chip.registers.v[0]
+        assert child.op_table is not None
+        assert child.op_table[0xC] is not chip.op_table[0xC]
+
+    def test_memory_is_copied_on_write(self):
+        chip = Chip8()
+        child = chip.fork()
+        assert child.memory.data is chip.memory.data
+
+        child.memory.set_byte(0x300, 0xAA)
+        assert chip.memory.get_byte(0x300) == 0
+        assert child.memory.get_byte(0x300) == 0xAA
+
+        chip.memory.set(0x301, b'\xBB')
+        assert chip.memory.get_byte(0x301) == 0xBB
+        assert child.memory.get_byte(0x301) == 0
+
+
+class TestBlockMemoryOpcodes:
+    def test_store_bcd(self):
+        chip = Chip8()
+        chip.load_game(BytesIO(b'\xF3\x33'))
+        chip.registers.v[3] = 254
+        chip.registers.i = 0x300
+        chip.emulate_cycle()
+
+        assert chip.memory.get(0x300, 3) == b'\x02\x05\x04'
+        assert chip.registers.i == 0x300
+        assert chip.program_counter.value == 0x202
+
+    def test_store_and_load_registers(self):
+        chip = Chip8()
+        chip.load_game(BytesIO(b'\xF2\x55\xA3\x00\xF3\x65'))
+        chip.registers.v[0:4] = b'\x0A\x0B\x0C\x0D'
+        chip.registers.i = 0x300
+        chip.emulate_cycle()
+
+        assert chip.memory.get(0x300, 4) == b'\x0A\x0B\x0C\x00'
+        assert chip.registers.i == 0x303
+
+        chip.registers.v[0:4] = bytes(4)
+        chip.emulate_cycle()
+        chip.emulate_cycle()
+
+        assert chip.registers.v[0:5] == b'\x0A\x0B\x0C\x00\x00'
+        assert chip.registers.i == 0x304
+
+    def test_i_unchanged_quirk(self):
+        chip = Chip8(quirks=Quirks(load_store_increments_i=False))
+        chip.load_game(BytesIO(b'\xF5\x55'))
+        chip.registers.i = 0x300
+        chip.emulate_cycle()
+
+        assert chip.registers.i == 0x300
+
+    def test_store_past_end_of_memory(self):
+        chip = Chip8()
+        chip.load_game(BytesIO(b'\xF5\x55'))
+        chip.registers.i = 0xFFE
+
+        with pytest.raises(IndexError):
+            chip.emulate_cycle()
+        assert len(chip.memory.data) == 4096
+
+
+class TestMachineState:
+    def test_register_files_are_per_machine(self):
+        first = Chip8()
+        second = Chip8()
+        first.registers.v[3] = 7
+
+        assert second.registers.v[3] == 0
+        assert first.registers.v is not second.registers.v
+
+    def test_handlers_see_in_place_register_updates(self):
+        chip = Chip8()
+        chip.load_game(BytesIO(b'\x80\x10'))
+        chip.registers.v[:] = bytes(range(16))
+        chip.emulate_cycle()
+
+        assert chip.registers.v[0] == 1
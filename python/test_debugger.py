@@ -0,0 +1,82 @@
+# pylint: disable=no-self-use,too-few-public-methods
+
+import pytest
+from debugger import BreakpointHit, Debugger, register_equals
+
+PROGRAM = bytes([
+    0x60, 0x00,  # 0x200: V0 = 0
+    0xA3, 0x00,  # 0x202: I = 0x300
+    0x70, 0x01,  # 0x204: V0 += 1
+    0xF0, 0x33,  # 0x206: store BCD of V0 at I
+    0xF0, 0x65,  # 0x208: load V0 from I
+    0xA3, 0x00,  # 0x20A: I = 0x300
+    0x12, 0x04,  # 0x20C: jump 0x204
+])
+
+
+class TestDebugger:
+    def test_unused_debugger_does_not_instrument(self, make_chip):
+        chip = make_chip(PROGRAM)
+        debugger = Debugger(chip)
+        debugger.add_breakpoint(0x204)
+        debugger.add_watchpoint(0x300, read=True)
+        debugger.clear()
+        assert 'emulate_cycle' not in vars(chip)
+        assert 'get' not in vars(chip.memory)
+        assert chip.memory.write_listeners == []
+
+    def test_breakpoint_stops_before_instruction(self, make_chip):
+        chip = make_chip(PROGRAM)
+        debugger = Debugger(chip)
+        debugger.add_breakpoint(0x206)
+        hit = debugger.run(100)
+        assert (hit.kind, hit.pc) == ('breakpoint', 0x206)
+        assert chip.program_counter.value == 0x206
+        assert chip.memory.get(0x300, 1) == b'\x00'
+
+        hit = debugger.run(100)
+        assert hit.pc == 0x206
+        assert chip.registers.v[0] == 1
+
+    def test_conditional_breakpoint(self, make_chip):
+        chip = make_chip(PROGRAM)
+        debugger = Debugger(chip)
+        debugger.add_breakpoint(0x206, register_equals(0, 0))
+        assert debugger.run(100) is None
+
+    def test_condition_breaks_when_it_becomes_true(self, make_chip):
+        chip = make_chip(PROGRAM)
+        debugger = Debugger(chip)
+        debugger.add_condition(lambda chip8: chip8.registers.i == 0x300)
+        hit = debugger.run(100)
+        assert (hit.kind, hit.pc) == ('condition', 0x204)
+
+        # FX65 moves I on, and the next ANNN sets it back
+        hit = debugger.run(100)
+        assert (hit.kind, hit.pc) == ('condition', 0x20C)
+
+    def test_write_watchpoint(self, make_chip):
+        chip = make_chip(PROGRAM)
+        debugger = Debugger(chip)
+        debugger.add_watchpoint(0x302)
+        hit = debugger.run(100)
+        assert (hit.kind, hit.pc, hit.address) == ('write', 0x206, 0x302)
+        assert chip.program_counter.value == 0x208
+
+    def test_read_watchpoint(self, make_chip):
+        chip = make_chip(PROGRAM)
+        debugger = Debugger(chip)
+        watchpoint = debugger.add_watchpoint(0x300, 0x303, read=True,
+                                             write=False)
+        hit = debugger.run(100)
+        assert (hit.kind, hit.pc, hit.address) == ('read', 0x208, 0x300)
+        debugger.remove_watchpoint(watchpoint)
+        assert 'get' not in vars(chip.memory)
+        assert debugger.run(100) is None
+
+    def test_breaks_raise_from_emulate_cycle(self, make_chip):
+        chip = make_chip(PROGRAM)
+        Debugger(chip).add_breakpoint(0x202)
+        chip.emulate_cycle()
+        with pytest.raises(BreakpointHit):
+            chip.emulate_cycle()
@@ -0,0 +1,84 @@
+# pylint: disable=no-self-use,too-few-public-methods
+
+import io
+import struct
+import sys
+import zlib
+import pytest
+from displays import create_display
+from displays.memory_display import PNG_SIGNATURE
+from graphics import Graphics
+
+
+def smiley():
+    graphics = Graphics()
+    graphics.set_sprite_line(0, 0, 0b10000001)
+    graphics.set_sprite_line(0, 1, 0b01111110)
+    return graphics
+
+
+class TestRegistry:
+    def test_headless_backends_do_not_import_sdl(self):
+        for name in ('null', 'terminal', 'memory'):
+            create_display(name)
+        assert 'sdl2' not in sys.modules
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_display('hologram')
+
+    def test_null_display_consumes_dirty_rows(self):
+        graphics = smiley()
+        create_display('null').draw(graphics)
+        assert graphics.take_dirty_rows() is None
+
+
+class TestTerminalDisplay:
+    def test_draws_half_blocks(self):
+        stream = io.StringIO()
+        display = create_display('terminal', stream=stream)
+        display.draw(smiley())
+        first_line = stream.getvalue().split('\x1b[2;1H')[0]
+        assert first_line.startswith('\x1b[1;1H▀▄▄▄▄▄▄▀ ')
+
+    def test_redraws_only_changed_lines(self):
+        stream = io.StringIO()
+        display = create_display('terminal', stream=stream)
+        graphics = Graphics()
+        display.draw(graphics)
+        stream.seek(0)
+        stream.truncate()
+
+        graphics.set_sprite_line(0, 5, 0xFF)
+        display.draw(graphics)
+        assert stream.getvalue().startswith('\x1b[3;1H▄▄▄▄▄▄▄▄ ')
+        assert stream.getvalue().count('\x1b[') == 1
+
+
+class TestMemoryDisplay:
+    def test_keeps_latest_frames(self):
+        display = create_display('memory', max_frames=2)
+        graphics = Graphics()
+        for y in range(3):
+            graphics.set_sprite_line(0, y, 0xFF)
+            display.draw(graphics)
+        assert len(display.frames) == 2
+        assert display.frames[-1] == graphics.to_bytes()
+
+    def test_save_png(self, tmp_path):
+        display = create_display('memory')
+        display.draw(smiley())
+        path = tmp_path / 'frame.png'
+        display.save_png(path, scale=2)
+
+        data = path.read_bytes()
+        assert data.startswith(PNG_SIGNATURE)
+        (width, height, depth) = struct.unpack('>IIB', data[16:25])
+        assert (width, height, depth) == (128, 64, 1)
+
+        idat_length = struct.unpack('>I', data[33:37])[0]
+        scanlines = zlib.decompress(data[41:41 + idat_length])
+        assert len(scanlines) == 64 * 17
+        assert scanlines[:3] == b'\x00\xC0\x03'
+        assert scanlines[17:20] == b'\x00\xC0\x03'
+        assert scanlines[34:37] == b'\x00\x3F\xFC'
@@ -0,0 +1,55 @@
+# pylint: disable=no-self-use,too-few-public-methods
+
+import random
+import pytest
+from frame_delta import FrameDecoder, FrameEncoder
+from graphics import Graphics
+
+
+def sprite_frames(count):
+    rng = random.Random(1)
+    graphics = Graphics()
+    for _ in range(count):
+        x = rng.randrange(56)
+        y = rng.randrange(27)
+        for line in range(5):
+            graphics.set_sprite_line(x, y + line, rng.randrange(256))
+        yield list(graphics.rows)
+
+
+class TestFrameDelta:
+    def test_round_trip(self):
+        frames = list(sprite_frames(50))
+        encoder = FrameEncoder()
+        recording = b''.join(encoder.encode(rows) for rows in frames)
+
+        decoded = list(FrameDecoder().decode_stream(recording))
+
+        assert decoded == frames
+
+    def test_small_changes_encode_small(self):
+        frames = list(sprite_frames(100))
+        encoder = FrameEncoder()
+        encoder.encode(frames[0])
+        sizes = [len(encoder.encode(rows)) for rows in frames[1:]]
+
+        assert max(sizes) < 256 // 10
+        assert len(encoder.encode(frames[-1])) == 5
+
+    def test_reset_starts_with_keyframe(self):
+        frames = list(sprite_frames(3))
+        encoder = FrameEncoder()
+        encoder.encode(frames[0])
+        encoder.encode(frames[1])
+        encoder.reset()
+
+        (rows, _) = FrameDecoder().decode(encoder.encode(frames[2]))
+        assert rows == frames[2]
+
+    def test_delta_without_keyframe(self):
+        encoder = FrameEncoder()
+        frames = list(sprite_frames(2))
+        encoder.encode(frames[0])
+
+        with pytest.raises(ValueError):
+            FrameDecoder().decode(encoder.encode(frames[1]))
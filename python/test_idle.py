@@ -0,0 +1,93 @@
+# pylint: disable=no-self-use,too-few-public-methods
+
+import pytest
+from idle import IdleSkipper
+from scheduler import Scheduler
+from stack import StackOverflowError
+
+KEY_WAIT = bytes([
+    0xF1, 0x0A,  # 0x200: wait for key into V1
+    0x71, 0x01,  # 0x202: V1 += 1
+    0x12, 0x00,  # 0x204: jump 0x200
+])
+
+DELAY_LOOP = bytes([
+    0x60, 0x20,  # 0x200: V0 = 0x20
+    0xF0, 0x15,  # 0x202: delay = V0
+    0xF0, 0x07,  # 0x204: V0 = delay
+    0x30, 0x00,  # 0x206: skip if V0 == 0
+    0x12, 0x04,  # 0x208: jump 0x204
+    0x71, 0x01,  # 0x20A: V1 += 1
+    0x12, 0x00,  # 0x20C: jump 0x200
+])
+
+HALT = bytes([0x71, 0x01, 0x12, 0x02])
+
+COUNTER = bytes([0x71, 0x01, 0x12, 0x00])
+
+
+def run_frames(chip, skip_idle, frames=40, cpu_hz=700):
+    scheduler = Scheduler(chip, cpu_hz, throttled=False,
+                          skip_idle=skip_idle)
+    for frame in range(frames):
+        if frame == 17:
+            chip.keys.press_key(4)
+        if frame == 18:
+            chip.keys.release_key(4)
+        scheduler.run_frame()
+    return (chip, scheduler)
+
+
+class TestIdleSkipper:
+    @pytest.mark.parametrize('program', [KEY_WAIT, DELAY_LOOP, HALT,
+                                         COUNTER],
+                             ids=['key_wait', 'delay_loop', 'halt',
+                                  'counter'])
+    def test_matches_plain_interpreter(self, program, make_chip):
+        (skipped, _) = run_frames(make_chip(program), True)
+        (plain, _) = run_frames(make_chip(program), False)
+        assert skipped.snapshot() == plain.snapshot()
+
+    @pytest.mark.parametrize('program', [KEY_WAIT, DELAY_LOOP, HALT],
+                             ids=['key_wait', 'delay_loop', 'halt'])
+    def test_skips_idle_cycles(self, program, make_chip):
+        (_, scheduler) = run_frames(make_chip(program), True)
+        assert scheduler.idle.skipped_cycles > scheduler.cycles // 2
+
+    def test_busy_loop_is_not_skipped(self, make_chip):
+        (_, scheduler) = run_frames(make_chip(COUNTER), True)
+        assert scheduler.idle.skipped_cycles == 0
+
+    def test_key_press_ends_the_wait(self, make_chip):
+        chip = make_chip(KEY_WAIT)
+        skipper = IdleSkipper(chip)
+        skipper.run(100)
+        assert chip.program_counter.value == 0x200
+        chip.keys.press_key(7)
+        skipper.run(2)
+        assert chip.registers.v[1] == 8
+
+    def test_memory_writes_invalidate_loops(self, make_chip):
+        chip = make_chip(HALT)
+        skipper = IdleSkipper(chip)
+        skipper.run(10)
+        chip.memory.set(0x202, b'\x12\x00')
+        skipper.run(10)
+        assert chip.registers.v[1] == 6
+        assert skipper.skipped_cycles == 8
+
+    def test_skip_out_of_the_loop_is_not_skipped(self, make_chip):
+        # 3000 skips over the jump back into a draw, which then returns
+        program = bytes([0x30, 0x00, 0x12, 0x00, 0xD0, 0x11, 0x12, 0x00])
+        skipped = make_chip(program)
+        IdleSkipper(skipped).run(30)
+        plain = make_chip(program)
+        for _ in range(30):
+            plain.emulate_cycle()
+        assert skipped.snapshot() == plain.snapshot()
+        assert skipped.registers.v[15] == 1
+
+    def test_calls_from_the_loop_still_overflow(self, make_chip):
+        program = bytes([0x30, 0x00, 0x12, 0x00, 0x22, 0x00])
+        with pytest.raises(StackOverflowError):
+            IdleSkipper(make_chip(program)).run(100)
@@ -0,0 +1,108 @@
+# pylint: disable=no-self-use,too-few-public-methods
+
+from io import BytesIO
+import pytest
+from chip8 import Chip8, Quirks
+
+np = pytest.importorskip('numpy')
+from lockstep import LockstepBatch  # noqa: E402 pylint: disable=C0413
+
+PROGRAM = bytes([
+    0x60, 0x05,  # 0x200: V0 = 5
+    0x61, 0x03,  # 0x202: V1 = 3
+    0x80, 0x14,  # 0x204: V0 += V1
+    0x81, 0x05,  # 0x206: V1 -= V0
+    0x82, 0x06,  # 0x208: V2 >>= 1
+    0x82, 0x0E,  # 0x20A: V2 <<= 1
+    0x22, 0x20,  # 0x20C: call 0x220
+    0x30, 0x08,  # 0x20E: skip if V0 == 8
+    0x70, 0x01,  # 0x210: V0 += 1
+    0xF0, 0x15,  # 0x212: delay = V0
+    0xF1, 0x07,  # 0x214: V1 = delay
+    0xD1, 0x25,  # 0x216: draw 8x5
+    0xE3, 0x9E,  # 0x218: skip if key V3 pressed
+    0xF3, 0x29,  # 0x21A: I = char V3
+    0x12, 0x04,  # 0x21C: jump 0x204
+    0x00, 0x00,
+    0x84, 0x53,  # 0x220: V4 ^= V5
+    0xA3, 0x00,  # 0x222: I = 0x300
+    0xF5, 0x33,  # 0x224: BCD of V5
+    0xF2, 0x65,  # 0x226: load V0-V2
+    0xA3, 0x10,  # 0x228: I = 0x310
+    0xF5, 0x55,  # 0x22A: store V0-V5
+    0x00, 0xEE,  # 0x22C: return
+])
+
+
+def make_chips(count):
+    chips = []
+    for k in range(count):
+        chip = Chip8()
+        chip.load_game(BytesIO(PROGRAM))
+        chip.registers.v[3] = k % 16
+        chip.registers.v[5] = (k * 7) % 256
+        chip.keys.press_key(k % 3)
+        chips.append(chip)
+    return chips
+
+
+class TestLockstepBatch:
+    def test_matches_separate_machines(self):
+        chips = make_chips(20)
+        batch = LockstepBatch(len(chips))
+        for index, chip in enumerate(chips):
+            batch.load(index, chip)
+
+        batch.run(300)
+        for chip in chips:
+            for _ in range(300):
+                chip.emulate_cycle()
+
+        for index, chip in enumerate(chips):
+            result = Chip8()
+            batch.store(index, result)
+            assert result.program_counter.value == chip.program_counter.value
+            assert result.registers.v == chip.registers.v
+            assert result.registers.i == chip.registers.i
+            assert list(result.stack) == list(chip.stack)
+            assert result.timers.delay_timer == chip.timers.delay_timer
+            assert result.graphics.rows == chip.graphics.rows
+            assert result.graphics.should_draw
+            assert result.graphics.take_dirty_rows() == (0, 32)
+            assert result.memory.data == chip.memory.data
+        assert not batch.faulted.any()
+
+    def test_fault_stops_machine(self):
+        batch = LockstepBatch(2)
+        batch.load_game(b'\x60\x01\xF0\xFF')
+        batch.memory[1, 0x202:0x204] = [0x12, 0x00]
+
+        batch.run(4)
+
+        assert list(batch.faulted) == [True, False]
+        assert batch.pc[0] == 0x202
+
+    @pytest.mark.parametrize('clip_sprites', [True, False])
+    def test_sprites_at_screen_edges(self, clip_sprites):
+        quirks = Quirks(clip_sprites=clip_sprites)
+        positions = [(0, 0), (60, 3), (57, 30), (130, 40), (63, 31)]
+        chips = []
+        for (x, y) in positions:
+            chip = Chip8(quirks=quirks)
+            chip.load_game(BytesIO(b'\xD0\x1F\x70\x02\xD0\x15'))
+            chip.registers.v[0] = x
+            chip.registers.v[1] = y
+            chips.append(chip)
+        batch = LockstepBatch(len(chips), quirks=quirks)
+        for index, chip in enumerate(chips):
+            batch.load(index, chip)
+
+        batch.run(3)
+        for (index, chip) in enumerate(chips):
+            for _ in range(3):
+                chip.emulate_cycle()
+            result = Chip8()
+            batch.store(index, result)
+            assert result.graphics.rows == chip.graphics.rows
+            assert result.registers.v == chip.registers.v
+        assert not batch.faulted.any()
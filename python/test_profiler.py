@@ -0,0 +1,65 @@
+# pylint: disable=no-self-use,too-few-public-methods
+
+import json
+from debugger import Debugger
+from profiler import Profiler
+
+PROGRAM = b'\x70\x01\x81\x04\x12\x00'
+
+
+class TestProfiler:
+    def test_counts(self, make_chip):
+        chip = make_chip(PROGRAM)
+        profiler = Profiler()
+        profiler.attach(chip)
+        for _ in range(30):
+            chip.emulate_cycle()
+
+        assert chip.registers.v[0] == 10
+        assert profiler.cycles == 30
+        assert profiler.family_counts[0x7] == 10
+        assert profiler.handler_counts['OpcodeSet8xxx.addition_8xx4'] == 10
+        assert profiler.hot_pcs(1)[0][1] == 10
+
+    def test_detach_restores_method(self, make_chip):
+        chip = make_chip(PROGRAM)
+        profiler = Profiler()
+        profiler.attach(chip)
+        chip.emulate_cycle()
+        profiler.detach(chip)
+        chip.emulate_cycle()
+
+        assert profiler.cycles == 1
+        assert 'emulate_cycle' not in vars(chip)
+
+    def test_chains_with_debugger(self, make_chip):
+        chip = make_chip(PROGRAM)
+        debugger = Debugger(chip)
+        debugger.add_breakpoint(0x202)
+        profiler = Profiler()
+        profiler.attach(chip)
+
+        hit = debugger.run(10)
+        assert hit is not None and hit.pc == 0x202
+
+        profiler.detach(chip)
+        assert debugger.run(10).pc == 0x202
+        debugger.clear()
+        assert 'emulate_cycle' not in vars(chip)
+
+    def test_exports(self, tmp_path, make_chip):
+        chip = make_chip(PROGRAM)
+        profiler = Profiler()
+        profiler.attach(chip)
+        for _ in range(3):
+            chip.emulate_cycle()
+
+        profiler.write_json(tmp_path / 'profile.json')
+        profiler.write_collapsed(tmp_path / 'profile.folded')
+        report = json.loads((tmp_path / 'profile.json').read_text())
+        folded = (tmp_path / 'profile.folded').read_text().splitlines()
+
+        assert report['families'] == {'1xxx': 1, '7xxx': 1, '8xxx': 1}
+        assert report['hot_pcs'][0] == ['0x200', 1]
+        assert len(folded) == 3
+        assert folded[0].startswith('emulate_cycle;OpcodeSet1xxx;jump_1nnn ')
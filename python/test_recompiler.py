@@ -0,0 +1,60 @@
+# pylint: disable=no-self-use,too-few-public-methods
+
+from recompiler import Recompiler
+
+# Counts V0 up in a loop, doing some arithmetic and drawing on the way
+LOOP_PROGRAM = bytes([
+    0x61, 0x05,  # 0x200: V1 = 5
+    0x70, 0x01,  # 0x202: V0 += 1
+    0x82, 0x14,  # 0x204: V2 += V1
+    0x83, 0x26,  # 0x206: V3 = V2 >> 1
+    0xC4, 0x0F,  # 0x208: V4 = rand & 0x0F
+    0xA0, 0x00,  # 0x20A: I = 0
+    0xD4, 0x35,  # 0x20C: draw V4, V3
+    0x12, 0x02,  # 0x20E: jump 0x202
+])
+
+
+class TestRecompiler:
+    def test_matches_interpreter(self, make_chip):
+        interpreted = make_chip(LOOP_PROGRAM)
+        for _ in range(1000):
+            interpreted.emulate_cycle()
+
+        compiled = make_chip(LOOP_PROGRAM)
+        Recompiler(compiled).run(1000)
+
+        assert compiled.program_counter.value == \
+            interpreted.program_counter.value
+        assert compiled.registers.v == interpreted.registers.v
+        assert compiled.registers.i == interpreted.registers.i
+        assert compiled.graphics.rows == interpreted.graphics.rows
+
+    def test_block_stops_at_branch(self, make_chip):
+        chip = make_chip(LOOP_PROGRAM)
+        recompiler = Recompiler(chip)
+        block = recompiler.translate(0x202)
+
+        assert block.end == 0x20E
+        assert block.length == 6
+
+    def test_write_invalidates_block(self, make_chip):
+        chip = make_chip(b'\x60\x01\x12\x00')
+        recompiler = Recompiler(chip)
+        recompiler.run(2)
+        assert chip.registers.v[0] == 1
+        assert 0x200 in recompiler.blocks
+
+        chip.memory.set_byte(0x201, 0x07)
+        assert 0x200 not in recompiler.blocks
+
+        recompiler.run(2)
+        assert chip.registers.v[0] == 7
+
+    def test_unrelated_write_keeps_block(self, make_chip):
+        chip = make_chip(b'\x60\x01\x12\x00')
+        recompiler = Recompiler(chip)
+        recompiler.run(2)
+
+        chip.memory.set(0x300, b'\x01\x02')
+        assert 0x200 in recompiler.blocks
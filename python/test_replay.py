@@ -0,0 +1,63 @@
+# pylint: disable=no-self-use,too-few-public-methods
+
+from io import BytesIO
+from chip8 import Chip8
+from profiler import Profiler
+from replay import Recorder, replay
+from scheduler import Scheduler
+
+# Draws random sprites, keyed and paced by the delay timer
+PROGRAM = bytes([
+    0xC0, 0x3F,  # 0x200: V0 = rand & 0x3F
+    0xC1, 0x1F,  # 0x202: V1 = rand & 0x1F
+    0xF2, 0x0A,  # 0x204: wait for key into V2
+    0xF2, 0x29,  # 0x206: I = char V2
+    0xD0, 0x15,  # 0x208: draw
+    0x63, 0x03,  # 0x20A: V3 = 3
+    0xF3, 0x15,  # 0x20C: delay = V3
+    0xF4, 0x07,  # 0x20E: V4 = delay
+    0x34, 0x00,  # 0x210: skip if V4 == 0
+    0x12, 0x0E,  # 0x212: jump 0x20E
+    0x12, 0x00,  # 0x214: jump 0x200
+])
+
+
+class TestReplay:
+    def test_replay_is_bit_exact(self):
+        chip = Chip8(seed=42)
+        chip.load_game(BytesIO(PROGRAM))
+        recording = BytesIO()
+        recorder = Recorder(chip, recording)
+        scheduler = Scheduler(chip, cpu_hz=600, throttled=False)
+
+        for frame in range(40):
+            if frame % 7 == 0:
+                chip.keys.press_key(frame % 16)
+            if frame % 7 == 3:
+                chip.keys.release_key((frame - 3) % 16)
+            scheduler.run_frame()
+        recorder.close()
+
+        replayed = replay(recording.getvalue())
+
+        assert replayed.snapshot() == chip.snapshot()
+        assert any(chip.graphics.rows)
+
+    def test_close_detaches(self):
+        chip = Chip8()
+        recorder = Recorder(chip, BytesIO())
+        recorder.close()
+
+        assert 'emulate_cycle' not in vars(chip)
+        assert chip.keys.listeners == []
+        assert chip.timers.listeners == []
+
+    def test_close_restores_previous_wrapper(self):
+        chip = Chip8()
+        profiler = Profiler()
+        profiler.attach(chip)
+        recorder = Recorder(chip, BytesIO())
+        recorder.close()
+        chip.emulate_cycle()
+
+        assert profiler.cycles == 1
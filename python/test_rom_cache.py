@@ -0,0 +1,83 @@
+# pylint: disable=no-self-use,too-few-public-methods
+
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from chip8 import Chip8
+from memory import MEMORY_SIZE, PROGRAM_START, Memory
+from rom_cache import RomCache
+
+ROM = b'\x60\x2A\x12\x02'
+
+
+def run_shared_rom(name):
+    cache = RomCache()
+    chip = Chip8(cache.attach(name))
+    chip.emulate_cycle()
+    chip.emulate_cycle()
+    result = (chip.registers.v[0], chip.memory.shared)
+    del chip
+    cache.close()
+    return result
+
+
+class TestRomCache:
+    def test_instances_share_one_image(self, tmp_path):
+        rom_path = tmp_path / 'game.ch8'
+        rom_path.write_bytes(ROM)
+        copy_path = tmp_path / 'copy.ch8'
+        copy_path.write_bytes(ROM)
+        cache = RomCache()
+
+        first = cache.memory(str(rom_path))
+        second = cache.memory(str(copy_path))
+
+        assert first.data is second.data
+        assert len(first.data) == MEMORY_SIZE
+        assert first.get(PROGRAM_START, 4) == ROM
+        assert first.data[0:80] == Memory().data[0:80]
+        assert cache.digest(str(rom_path)) == cache.digest(str(copy_path))
+
+    def test_write_copies_image(self, tmp_path):
+        rom_path = tmp_path / 'game.ch8'
+        rom_path.write_bytes(ROM)
+        cache = RomCache()
+        chip = Chip8(cache.memory(str(rom_path)))
+
+        chip.memory.set_byte(PROGRAM_START, 0x61)
+
+        assert not chip.memory.shared
+        assert cache.image(str(rom_path))[PROGRAM_START] == 0x60
+
+    def test_workers_attach_shared_memory(self, tmp_path):
+        rom_path = tmp_path / 'game.ch8'
+        rom_path.write_bytes(ROM)
+        cache = RomCache()
+        name = cache.share(str(rom_path))
+        try:
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                results = list(executor.map(run_shared_rom, [name] * 4))
+        finally:
+            cache.close()
+
+        assert results == [(0x2A, True)] * 4
+
+    def test_attach_reuses_own_block(self, tmp_path):
+        rom_path = tmp_path / 'game.ch8'
+        rom_path.write_bytes(ROM)
+        cache = RomCache()
+        name = cache.share(str(rom_path))
+
+        memory = cache.attach(name)
+
+        assert memory.data is cache.image(str(rom_path))
+        assert not cache.attached_blocks
+        del memory
+        cache.close()
+        assert not cache.created_blocks
+
+    def test_rejects_oversized_rom(self, tmp_path):
+        rom_path = tmp_path / 'huge.ch8'
+        rom_path.write_bytes(bytes(MEMORY_SIZE))
+
+        with pytest.raises(ValueError):
+            RomCache().image(str(rom_path))
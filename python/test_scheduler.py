@@ -0,0 +1,45 @@
+# pylint: disable=no-self-use,too-few-public-methods
+
+import time
+from scheduler import Scheduler, TIMER_HZ
+
+
+class TestScheduler:
+    def test_instructions_per_frame(self, make_chip):
+        chip = make_chip(b'\x70\x01\x12\x00')
+        chip.timers.delay_timer = 10
+        scheduler = Scheduler(chip, cpu_hz=600, throttled=False)
+
+        scheduler.run(frames=3)
+
+        assert scheduler.cycles == 30
+        assert chip.registers.v[0] == 15
+        assert chip.timers.delay_timer == 7
+
+    def test_fractional_cycles_per_frame(self, make_chip):
+        chip = make_chip(b'\x12\x00')
+        scheduler = Scheduler(chip, cpu_hz=90, throttled=False)
+
+        scheduler.run(frames=4)
+
+        assert scheduler.cycles == 6
+
+    def test_renders_only_when_dirty(self, make_chip):
+        chip = make_chip(b'\xA0\x00\xD0\x05\x12\x04')
+        frames = []
+        scheduler = Scheduler(chip, cpu_hz=TIMER_HZ * 2, throttled=False,
+                              render=lambda g: frames.append(g.to_bytes()))
+
+        scheduler.run(frames=3)
+
+        assert len(frames) == 1
+        assert not chip.graphics.should_draw
+
+    def test_throttled_paces_frames(self, make_chip):
+        chip = make_chip(b'\x12\x00')
+        scheduler = Scheduler(chip, cpu_hz=TIMER_HZ)
+
+        start = time.perf_counter()
+        scheduler.run(frames=6)
+
+        assert time.perf_counter() - start >= 5 / TIMER_HZ
@@ -0,0 +1,69 @@
+# pylint: disable=no-self-use,too-few-public-methods
+
+import pytest
+from scheduler import Scheduler
+from timing import TimingModel
+from util import compile_pattern
+
+
+class TestTimingModel:
+    def test_compile_pattern(self):
+        assert compile_pattern('8XY4') == (0xF00F, 0x8004)
+        assert compile_pattern('DXYN') == (0xF000, 0xD000)
+        with pytest.raises(ValueError):
+            compile_pattern('8XY')
+
+    def test_most_specific_pattern_wins(self):
+        timing = TimingModel(costs={'8XYN': 10, '8XY4': 20, '00E0': 5},
+                             default_cost=3)
+        assert timing.cost(0x8125) == (10, False)
+        assert timing.cost(0x8124) == (20, False)
+        assert timing.cost(0x00E0) == (5, False)
+        assert timing.cost(0x6000) == (3, False)
+
+    def test_cosmac_vip_draw_waits_for_vblank(self):
+        timing = TimingModel.cosmac_vip()
+        assert timing.cost(0xD125)[1]
+        assert not timing.cost(0x6000)[1]
+
+
+class TestTimedScheduler:
+    def test_default_model_matches_cpu_hz(self, make_chip):
+        timed = make_chip(b'\x70\x01\x12\x00')
+        untimed = make_chip(b'\x70\x01\x12\x00')
+        timing = TimingModel(clock_hz=600)
+        Scheduler(timed, throttled=False, timing=timing).run(frames=6)
+        Scheduler(untimed, cpu_hz=600, throttled=False).run(frames=6)
+        assert timed.registers.v[0] == untimed.registers.v[0] == 30
+        assert timing.cycles == 60
+
+    def test_costs_limit_instructions_per_frame(self, make_chip):
+        # 600 cycles a frame at 30 cycles per add-and-jump
+        chip = make_chip(b'\x70\x01\x12\x00')
+        timing = TimingModel(36000, {'7XNN': 10, '1NNN': 20})
+        scheduler = Scheduler(chip, throttled=False, timing=timing)
+        scheduler.run(frames=2)
+        assert chip.registers.v[0] == 40
+        assert scheduler.cycles == 80
+
+    def test_overshoot_carries_into_next_frame(self, make_chip):
+        chip = make_chip(b'\x70\x01\x12\x00')
+        timing = TimingModel(60 * 25, {'7XNN': 10, '1NNN': 30})
+        scheduler = Scheduler(chip, throttled=False, timing=timing)
+        scheduler.run_frame()
+        assert chip.registers.v[0] == 1
+        scheduler.run_frame()
+        assert chip.registers.v[0] == 2
+        assert chip.program_counter.value == 0x202
+        scheduler.run_frame()
+        assert chip.registers.v[0] == 2
+        assert timing.cycles == 80
+
+    def test_draw_ends_the_frame(self, make_chip):
+        chip = make_chip(b'\x70\x01\xD0\x01\x12\x00')
+        scheduler = Scheduler(chip, throttled=False,
+                              timing=TimingModel.cosmac_vip())
+        chip.timers.delay_timer = 10
+        scheduler.run(frames=3)
+        assert chip.registers.v[0] == 3
+        assert chip.timers.delay_timer == 7
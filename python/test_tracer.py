@@ -0,0 +1,142 @@
+# pylint: disable=no-self-use,too-few-public-methods
+
+import io
+import pytest
+from debugger import BreakpointHit, Debugger
+from replay import Recorder
+from stack import StackUnderflowError
+from tracer import Tracer, main, read_dump
+
+PROGRAM = bytes([
+    0x60, 0x05,  # 0x200: V0 = 5
+    0xA3, 0x00,  # 0x202: I = 0x300
+    0x70, 0x01,  # 0x204: V0 += 1
+    0x12, 0x04,  # 0x206: jump 0x204
+])
+
+FAULTING = bytes([
+    0x61, 0x07,  # 0x200: V1 = 7
+    0x00, 0xEE,  # 0x202: return with an empty stack
+])
+
+
+def dump_bytes(tracer):
+    output = io.BytesIO()
+    tracer.dump(output)
+    return output.getvalue()
+
+
+class TestTracer:
+    def test_records_instructions(self, make_chip):
+        chip = make_chip(PROGRAM)
+        tracer = Tracer(capacity=16, dump_path=None)
+        tracer.attach(chip)
+        for _ in range(3):
+            chip.emulate_cycle()
+
+        (cycles, error, entries) = read_dump(dump_bytes(tracer))
+        assert (cycles, error) == (3, '')
+        assert entries == [
+            (0, 0x200, 0x6005, 0, 0, 5),
+            (1, 0x202, 0xA300, 0x300, None, None),
+            (2, 0x204, 0x7001, 0x300, 0, 6),
+        ]
+
+    def test_keeps_only_the_last_entries(self, make_chip):
+        chip = make_chip(PROGRAM)
+        tracer = Tracer(capacity=4, dump_path=None)
+        tracer.attach(chip)
+        for _ in range(11):
+            chip.emulate_cycle()
+
+        (cycles, _, entries) = read_dump(dump_bytes(tracer))
+        assert cycles == 11
+        assert [entry[0] for entry in entries] == [7, 8, 9, 10]
+        assert [entry[1] for entry in entries] == [0x206, 0x204, 0x206,
+                                                   0x204]
+        assert entries[-1][5] == 10
+
+    def test_dumps_on_exception(self, tmp_path, make_chip):
+        path = tmp_path / 'trace.bin'
+        chip = make_chip(FAULTING)
+        tracer = Tracer(dump_path=path)
+        tracer.attach(chip)
+        chip.emulate_cycle()
+        with pytest.raises(StackUnderflowError):
+            chip.emulate_cycle()
+
+        (cycles, error, entries) = read_dump(path.read_bytes())
+        assert cycles == 2
+        assert error.startswith('StackUnderflowError')
+        assert entries[-1][1:3] == (0x202, 0x00EE)
+
+    def test_detach(self, make_chip):
+        chip = make_chip(PROGRAM)
+        tracer = Tracer()
+        tracer.attach(chip)
+        tracer.detach(chip)
+        assert 'emulate_cycle' not in vars(chip)
+
+    def test_main_prints_trace(self, tmp_path, capsys, make_chip):
+        path = tmp_path / 'trace.bin'
+        chip = make_chip(PROGRAM)
+        tracer = Tracer(dump_path=None)
+        tracer.attach(chip)
+        chip.emulate_cycle()
+        with open(path, 'wb') as output:
+            tracer.dump(output)
+
+        assert main([str(path)]) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0].split() == ['0', '200', '6005', 'LD', 'V0,', '0x05',
+                                    'I=000', 'V0=05']
+        assert lines[-1] == '1 cycles'
+
+    def test_chains_with_other_wrappers(self, make_chip):
+        chip = make_chip(PROGRAM)
+        recorder = Recorder(chip, io.BytesIO())
+        tracer = Tracer(dump_path=None)
+        tracer.attach(chip)
+        for _ in range(10):
+            chip.emulate_cycle()
+        assert recorder.cycles == 10
+        assert tracer.cycles == 10
+
+        tracer.detach(chip)
+        recorder.close()
+        assert 'emulate_cycle' not in vars(chip)
+
+    def test_breakpoints_do_not_dump(self, tmp_path, make_chip):
+        path = tmp_path / 'trace.bin'
+        chip = make_chip(PROGRAM)
+        debugger = Debugger(chip)
+        debugger.add_breakpoint(0x204)
+        tracer = Tracer(dump_path=path)
+        tracer.attach(chip)
+
+        chip.emulate_cycle()
+        chip.emulate_cycle()
+        with pytest.raises(BreakpointHit):
+            chip.emulate_cycle()
+
+        assert not path.exists()
+        (cycles, _, entries) = read_dump(dump_bytes(tracer))
+        assert cycles == 2
+        assert entries[-1][1] == 0x202
+
+    def test_watchpoints_record_the_instruction(self, tmp_path, make_chip):
+        path = tmp_path / 'trace.bin'
+        chip = make_chip(b'\x60\x05\xA3\x00\xF0\x55')
+        Debugger(chip).add_watchpoint(0x300)
+        tracer = Tracer(dump_path=path)
+        tracer.attach(chip)
+
+        chip.emulate_cycle()
+        chip.emulate_cycle()
+        with pytest.raises(BreakpointHit):
+            chip.emulate_cycle()
+
+        assert not path.exists()
+        (cycles, _, entries) = read_dump(dump_bytes(tracer))
+        assert cycles == 3
+        assert entries[-1] == (2, 0x204, 0xF055, 0x301, None, None)
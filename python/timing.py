@@ -0,0 +1,91 @@
+from scheduler import TIMER_HZ
+from util import compile_pattern
+
+# Approximate COSMAC VIP costs in 1802 machine cycles (8 clock periods,
+# about 4.5 microseconds at 1.7609 MHz), keyed by opcode pattern
+COSMAC_VIP_HZ = 1760900 // 8
+COSMAC_VIP_COSTS = {
+    '00E0': 24,
+    '00EE': 23,
+    '0NNN': 23,
+    '1NNN': 23,
+    '2NNN': 23,
+    '3XNN': 12,
+    '4XNN': 12,
+    '5XY0': 16,
+    '6XNN': 6,
+    '7XNN': 10,
+    '8XYN': 44,
+    '9XY0': 16,
+    'ANNN': 12,
+    'BNNN': 23,
+    'CXNN': 36,
+    'DXYN': 480,
+    'EX9E': 16,
+    'EXA1': 16,
+    'FX07': 10,
+    'FX0A': 10,
+    'FX15': 10,
+    'FX18': 10,
+    'FX1E': 19,
+    'FX29': 20,
+    'FX33': 204,
+    'FX55': 133,
+    'FX65': 133,
+}
+
+
+class TimingModel:
+    """
+    Cycle costs for each opcode, used by Scheduler to decide how many
+    instructions fit in a 60hz frame
+
+    costs maps opcode patterns to machine cycles, with X, Y and N as
+    placeholders; the most specific matching pattern wins and opcodes
+    matching none cost default_cost. When draw_waits_for_vblank is set,
+    DXYN ends the current frame, as the VIP interpreter waits for the
+    display interrupt before drawing.
+
+    The default model costs one cycle per instruction, which paces a
+    Scheduler exactly like an untimed one running at clock_hz.
+    """
+    def __init__(self, clock_hz=700, costs=None, default_cost=1,
+                 draw_waits_for_vblank=False):
+        self.clock_hz = clock_hz
+        self.default_cost = default_cost
+        self.draw_waits_for_vblank = draw_waits_for_vblank
+        self.patterns = sorted(
+            (compile_pattern(pattern) + (cycles, )
+             for (pattern, cycles) in (costs or {}).items()),
+            key=lambda entry: bin(entry[0]).count('1'),
+            reverse=True)
+
+        # Emulated machine cycles elapsed, including time spent waiting
+        self.cycles = 0
+        self.opcode_costs = {}
+
+    @classmethod
+    def cosmac_vip(cls):
+        return cls(COSMAC_VIP_HZ, COSMAC_VIP_COSTS,
+                   draw_waits_for_vblank=True)
+
+    @property
+    def cycles_per_frame(self):
+        return self.clock_hz / TIMER_HZ
+
+    def cost(self, opcode):
+        """
+        Returns (cycles, waits_for_vblank) for opcode
+        """
+        cost = self.opcode_costs.get(opcode)
+        if cost is None:
+            cost = (self.__lookup(opcode),
+                    self.draw_waits_for_vblank and opcode >> 12 == 0xD)
+            self.opcode_costs[opcode] = cost
+        return cost
+
+    def __lookup(self, opcode):
+        for (mask, value, cycles) in self.patterns:
+            if opcode & mask == value:
+                return cycles
+        return self.default_cost
@@ -0,0 +1,189 @@
+"""
+Instruction trace ring buffer
+
+Tracer keeps the last capacity instructions a Chip8 executed, each as
+four 16-bit words in one preallocated array: the PC, the opcode, I
+after the instruction, and the register it wrote with its new value
+(register << 8 | value, or NO_REGISTER). If an instruction raises, the
+buffer is written to dump_path before the exception propagates; a
+debugger.BreakpointHit is passed on without a dump.
+
+A dump is a header followed by the entries, oldest first:
+
+    b'C8TR', version, cycles executed, error length, error (UTF-8)
+    (pc: uint16, opcode: uint16, i: uint16, register: uint16) ...
+
+Decode one with:
+
+    python tracer.py chip8_trace.bin
+"""
+import argparse
+import struct
+import sys
+from array import array
+from analyzer import CLASSIFIER, Instruction
+from debugger import BreakpointHit
+
+MAGIC = b'C8TR'
+VERSION = 1
+HEADER = struct.Struct('>4sBQH')
+ENTRY = struct.Struct('>HHHH')
+ENTRY_WORDS = 4
+
+NO_REGISTER = 0xFFFF
+
+DUMP_PATH = 'chip8_trace.bin'
+
+
+def written_register(opcode):
+    """
+    Returns the V register opcode writes, other than the VF flag, or
+    NO_REGISTER
+    """
+    first = opcode >> 12
+    nn = opcode & 0x00FF
+    if first in (0x6, 0x7, 0x8, 0xC) or (first == 0xF
+                                         and nn in (0x07, 0x0A, 0x65)):
+        return (opcode >> 8) & 0xF
+    return NO_REGISTER
+
+
+class Tracer:
+    def __init__(self, capacity=4096, dump_path=DUMP_PATH):
+        self.capacity = capacity
+        self.dump_path = dump_path
+        self.entries = array('H', bytes(2 * ENTRY_WORDS * capacity))
+        self.cycles = 0
+        self.__written = {}
+        self.__saved_emulate_cycle = None
+
+    def attach(self, chip8):
+        """
+        Wraps the machine's current emulate_cycle, which may itself be
+        another tool's wrapper
+        """
+        self.__saved_emulate_cycle = vars(chip8).get('emulate_cycle')
+        run_instruction = chip8.emulate_cycle
+        program_counter = chip8.program_counter
+        registers = chip8.registers
+        v = registers.v
+        entries = self.entries
+        capacity = self.capacity
+        written = self.__written
+
+        def emulate_cycle():
+            cycles = self.cycles
+            slot = (cycles % capacity) * ENTRY_WORDS
+            pc = program_counter.value
+            entries[slot] = pc
+            entries[slot + 1] = 0
+            entries[slot + 2] = registers.i & 0xFFFF
+            entries[slot + 3] = NO_REGISTER
+            self.cycles = cycles + 1
+            hit = None
+            try:
+                data = chip8.memory.data
+                opcode = (data[pc] << 8) | data[pc + 1]
+                entries[slot + 1] = opcode
+                run_instruction()
+            except BreakpointHit as error:
+                # Breakpoints and conditions stop before the instruction
+                # runs, watchpoints after it
+                if error.address is None:
+                    self.cycles = cycles
+                    raise
+                hit = error
+            except Exception as error:
+                if self.dump_path is not None:
+                    with open(self.dump_path, 'wb') as output:
+                        self.dump(output, error)
+                raise
+
+            entries[slot + 2] = registers.i & 0xFFFF
+            reg = written.get(opcode)
+            if reg is None:
+                reg = written[opcode] = written_register(opcode)
+            if reg != NO_REGISTER:
+                entries[slot + 3] = (reg << 8) | v[reg]
+            if hit is not None:
+                raise hit
+
+        chip8.emulate_cycle = emulate_cycle
+
+    def detach(self, chip8):
+        if self.__saved_emulate_cycle is None:
+            del chip8.emulate_cycle
+        else:
+            chip8.emulate_cycle = self.__saved_emulate_cycle
+
+    def dump(self, output, error=None):
+        message = repr(error).encode() if error is not None else b''
+        output.write(HEADER.pack(MAGIC, VERSION, self.cycles, len(message)))
+        output.write(message)
+
+        count = min(self.cycles, self.capacity)
+        start = (self.cycles - count) % self.capacity * ENTRY_WORDS
+        ordered = array('H', self.entries[start:])
+        ordered.extend(self.entries[:start])
+        del ordered[count * ENTRY_WORDS:]
+        if sys.byteorder == 'little':
+            ordered.byteswap()
+        output.write(ordered.tobytes())
+
+
+def read_dump(dump):
+    """
+    Returns the cycle count, the error text and the list of
+    (cycle, pc, opcode, i, register, value) entries from a dump, with
+    register and value None for instructions that wrote no register
+    """
+    view = memoryview(dump)
+    (magic, version, cycles, message_size) = HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Unsupported trace format')
+    offset = HEADER.size
+    error = bytes(view[offset:offset + message_size]).decode()
+    offset += message_size
+
+    body = view[offset:]
+    count = len(body) // ENTRY.size
+    entries = []
+    for (index, (pc, opcode, i, written)) in enumerate(
+            ENTRY.iter_unpack(body[:count * ENTRY.size])):
+        if written == NO_REGISTER:
+            (register, value) = (None, None)
+        else:
+            (register, value) = divmod(written, 256)
+        entries.append((cycles - count + index, pc, opcode, i, register,
+                        value))
+    return (cycles, error, entries)
+
+
+def format_entry(entry):
+    (cycle, pc, opcode, i, register, value) = entry
+    text = Instruction(pc, opcode, CLASSIFIER.pattern(opcode)).disassemble()
+    line = f'{cycle:>10}  {pc:03X}  {opcode:04X}  {text:<18} I={i:03X}'
+    if register is not None:
+        line += f'  V{register:X}={value:02X}'
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Print a Chip-8 trace dump')
+    parser.add_argument('dump')
+    parser.add_argument('--last', type=int, default=None,
+                        help='only print the last N instructions')
+    args = parser.parse_args(argv)
+
+    with open(args.dump, 'rb') as dump_file:
+        (cycles, error, entries) = read_dump(dump_file.read())
+    if args.last is not None:
+        entries = entries[-args.last:]
+    for entry in entries:
+        print(format_entry(entry))
+    print(f'{cycles} cycles' + (f', stopped by {error}' if error else ''))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,26 @@
+PLACEHOLDERS = 'XYN'
+
+
 def get_opcode_digits(opcode):
     first = opcode >> 12
     second = (opcode & 0x0F00) >> 8
     third = (opcode & 0x00F0) >> 4
     fourth = opcode & 0x000F
     return (first, second, third, fourth)
+
+
+def compile_pattern(pattern):
+    """
+    Turns an opcode pattern such as '8XY4' into a (mask, value) pair
+    """
+    if len(pattern) != 4:
+        raise ValueError(f'Opcode patterns have four digits: {pattern}')
+    mask = 0
+    value = 0
+    for digit in pattern.upper():
+        mask <<= 4
+        value <<= 4
+        if digit not in PLACEHOLDERS:
+            mask |= 0xF
+            value |= int(digit, 16)
+    return (mask, value)